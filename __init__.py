@@ -11,28 +11,30 @@ logger = logging.getLogger(__name__)
 
 def convert_layout_to_animator(layout) -> tuple[dict[str, Node], list[Edge]]:
     """Convert layout to animator nodes and edges"""
-    # Convert all nodes, including dummy nodes
+    # Convert real nodes; dummy nodes only shape the routed edges
     nodes = {
         node_id: Node(
             id=node_id,
-            label=node.label if not getattr(node, 'dummy', False) else "",
+            label=node.label,
             type=node.type,
             position=(node.x, node.y),
             layer=node.rank  # Use rank as layer
         )
         for node_id, node in layout.nodes.items()
+        if not getattr(node, 'dummy', False)
     }
     
-    # Convert edges with their calculated points
+    # Convert edges, joining dummy chains into one routed polyline
     edges = []
-    for edge in layout.edges:
+    for edge in layout.merged_edges():
         if edge.points and len(edge.points) >= 2:
             edges.append(Edge(
                 start_node=edge.from_id,
                 end_node=edge.to_id,
                 label=edge.label,
                 start_pos=edge.points[0],
-                end_pos=edge.points[-1]
+                end_pos=edge.points[-1],
+                points=list(edge.points)
             ))
     
     return nodes, edges
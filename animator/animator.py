@@ -4,12 +4,15 @@ MermaidAnimator: A library for creating animated diagrams from Mermaid syntax wi
 
 from parser.parser import MermaidParser
 from layout.layout import SugiyamaLayoutGenerator
-from PIL import Image, ImageDraw, ImageFont
-import os
-import shutil
-from math import sin, cos, atan2, pi, tan
-import subprocess
-from collections import defaultdict
+from animator.encoder import create_sink
+from animator.compositor import FrameCompositor
+from animator.parallel import render_parallel
+from animator.timeline import Timeline, build_frame_plan
+from animator.sprites import LabelCache, NodeSpriteCache, draw_node_shape
+from animator.geometry import EdgeGeometry
+from layout.metrics import text_metrics
+from PIL import Image, ImageDraw, ImageColor
+from collections import defaultdict, deque
 from typing import Dict, List, Tuple, Optional, Union, Set
 from dataclasses import dataclass
 import logging
@@ -40,6 +43,7 @@ class Edge:
     end_pos: Optional[Tuple[float, float]] = None
     sequence_number: int = 0  # Added for sequential animation
     animation_start_time: float = 0.0  # When this edge starts animating
+    points: Optional[List[Tuple[float, float]]] = None  # Routed polyline from start_pos to end_pos
 
 @dataclass
 class AnimationConfig:
@@ -59,6 +63,17 @@ class AnimationConfig:
     text_color: str = "black"
     line_width: int = 3
     font_size: int = 20
+    frame_sink: str = "pipe"  # 'pipe' streams to ffmpeg, 'png' writes frame files (debug), 'null' discards
+    frame_buffer_size: int = 8  # Max frames queued for the ffmpeg writer thread
+    frames_dir: str = "output_frames"  # Frame directory used by the 'png' sink
+    keep_frames: bool = False  # Leave PNG frames on disk after encoding
+    static_layer: bool = True  # Bake finished elements into a cached background layer
+    workers: int = 1  # Render processes; 1 renders in the calling process
+    chunk_frames: int = 8  # Contiguous frames per worker task
+    hold_frames: bool = True  # Render idle stretches once and repeat the frame
+    label_cache_size: int = 4096  # Max pre-rendered label masks kept in memory
+    node_scale_steps: int = 32  # Pre-rendered pop-in scales per node size; 0 draws geometry every frame
+    node_sprite_cache_size: int = 1024  # Max pre-rendered node sprites kept in memory
 
 class MermaidAnimator:
     """Main class for parsing Mermaid syntax and generating sequential animations"""
@@ -69,15 +84,31 @@ class MermaidAnimator:
         self.edges: List[Edge] = []
         self._sequence_count = 0  # Track animation sequence
         self._total_duration = 0.0  # Total animation duration
+        self._compositor: Optional[FrameCompositor] = None
+        self._timeline: Optional[Timeline] = None
+        self._edge_geometry: Optional[EdgeGeometry] = None
+        self.skipped_frames = 0  # Frames repeated instead of rendered in the last run
         self._setup_font()
+        self._labels = LabelCache(self.metrics, self.config.label_cache_size)
+        self._node_sprites = NodeSpriteCache(
+            self.config.node_scale_steps, self.config.line_width,
+            self.config.node_color, self.config.edge_color, self.config.node_sprite_cache_size
+        ) if self.config.node_scale_steps > 0 else None
+        
+        # Resolve the text colour once; label alpha comes from the fade progress
+        if isinstance(self.config.text_color, str):
+            self.text_rgb = ImageColor.getrgb(self.config.text_color)[:3]
+        else:
+            self.text_rgb = tuple(self.config.text_color[:3])
         
     def _setup_font(self):
-        """Initialize font for text rendering"""
-        try:
-            self.font = ImageFont.truetype("Arial.ttf", self.config.font_size)
-        except OSError:
-            logger.warning("Arial font not found, using default font")
-            self.font = ImageFont.load_default()
+        """Initialize font for text rendering.
+
+        Label bounds are shared with any layout generator given the same
+        ``text_metrics``, so node boxes match the sizes the layout spaced.
+        """
+        self.metrics = text_metrics(self.config.font_size)
+        self.font = self.metrics.font
 
     def _calculate_animation_sequence(self):
         """Calculate the sequence of node and edge animations"""
@@ -86,16 +117,21 @@ class MermaidAnimator:
         current_time = 0.0
         processed_nodes = set()
         
+        # Index outgoing edges once, keeping their original order
+        outgoing_edges = defaultdict(list)
+        for edge in self.edges:
+            outgoing_edges[edge.start_node].append(edge)
+        
         # Find root nodes (nodes with no incoming edges)
         incoming_edges = {edge.end_node for edge in self.edges}
         root_nodes = [nid for nid in self.nodes if nid not in incoming_edges]
         if not root_nodes:
             root_nodes = [next(iter(self.nodes.keys()))]
         
-        # Process nodes in sequence
-        nodes_to_process = root_nodes.copy()
+        # Process nodes in breadth-first order
+        nodes_to_process = deque(root_nodes)
         while nodes_to_process:
-            current_node_id = nodes_to_process.pop(0)
+            current_node_id = nodes_to_process.popleft()
             if current_node_id in processed_nodes:
                 continue
                 
@@ -107,8 +143,7 @@ class MermaidAnimator:
             processed_nodes.add(current_node_id)
             
             # Find connected edges and nodes
-            connected_edges = [edge for edge in self.edges if edge.start_node == current_node_id]
-            for edge in connected_edges:
+            for edge in outgoing_edges.get(current_node_id, ()):
                 # Set edge timing slightly after node appears
                 edge.sequence_number = self._sequence_count
                 edge.animation_start_time = current_time + self.config.node_animation_duration + self.config.edge_delay
@@ -132,178 +167,155 @@ class MermaidAnimator:
             return 1.0
         return (time - start_time) / duration
 
-    def _create_frame(self, time: float, frame_number: int, temp_dir: str) -> str:
-        """Create a single frame of the animation with sequential node and edge appearance"""
+    def _draw_order(self) -> List[Tuple[str, Union[Node, Edge]]]:
+        """Elements in the order they are painted: edges behind nodes"""
+        return [('edge', edge) for edge in self.edges] + \
+               [('node', node) for node in self.nodes.values()]
+
+    def _element_intervals(self, elements: List[Tuple[str, Union[Node, Edge]]]) -> List[Tuple[float, float]]:
+        """``(start, end)`` animation interval of each element"""
+        intervals = []
+        for kind, element in elements:
+            duration = self.config.edge_animation_duration if kind == 'edge' \
+                else self.config.node_animation_duration
+            intervals.append((element.animation_start_time, element.animation_start_time + duration))
+        return intervals
+
+    def _element_progress(self, kind: str, element: Union[Node, Edge], time: float) -> float:
+        """Animation progress of a node or edge at ``time``"""
+        duration = self.config.edge_animation_duration if kind == 'edge' \
+            else self.config.node_animation_duration
+        return self._calculate_element_progress(time, element.animation_start_time, duration)
+
+    def _draw_element(self, img: Image.Image, draw: ImageDraw, kind: str,
+                      element: Union[Node, Edge], progress: float) -> None:
+        """Paint one element onto ``img``; ``draw`` is an ``ImageDraw`` on it"""
+        if kind == 'edge':
+            self._draw_edge(draw, element, progress)
+        else:
+            self._draw_node(img, draw, element, progress)
+
+    def _element_bounds(self, kind: str, element: Union[Node, Edge]) -> Optional[Tuple[float, float, float, float]]:
+        """Conservative bounding box of everything an element can paint"""
+        if kind == 'node':
+            if not element.position:
+                return None
+            x, y = element.position
+            w, h = self.metrics.node_size(element.label)
+            pad = self.config.line_width + 2
+            return (x - w/2 - pad, y - h/2 - pad, x + w/2 + pad, y + h/2 + pad)
+
+        geometry = self._geometry()
+        row = geometry.row(element)
+        if not geometry.has_segment(row):
+            return None
+        left, top, right, bottom = geometry.bounds(row)
+        # Line width and arrow head size
+        pad_x = pad_y = max(self.config.line_width, 15) + 2
+        if element.label:
+            text_bbox = self.metrics.bbox(element.label)
+            # Label box sits 15px above the midpoint with 5px padding
+            pad_x = max(pad_x, text_bbox[2] + 5 + 2)
+            pad_y = max(pad_y, text_bbox[3] + 15 + 5 + 2)
+        return (left - pad_x, top - pad_y, right + pad_x, bottom + pad_y)
+
+    def _render_frame(self, time: float) -> Image.Image:
+        """Render the frame at ``time`` with sequential node and edge appearance"""
+        if self._compositor is not None:
+            return self._compositor.render(time)
+
         img = Image.new('RGB', (self.config.width, self.config.height), 
                        self.config.background_color)
         draw = ImageDraw.Draw(img)
         
-        # Process edges first (they'll be drawn behind nodes)
-        for edge in self.edges:
-            progress = self._calculate_element_progress(
-                time, 
-                edge.animation_start_time,
-                self.config.edge_animation_duration
-            )
-            if progress > 0:
-                self._draw_edge(draw, edge, progress)
+        elements = self._draw_order()
+        if self._timeline is None:
+            self._timeline = Timeline(self._element_intervals(elements))
         
-        # Process nodes
-        for node in self.nodes.values():
-            progress = self._calculate_element_progress(
-                time,
-                node.animation_start_time,
-                self.config.node_animation_duration
-            )
-            if progress > 0:
-                self._draw_node(draw, node, progress)
+        # Draw order index keeps edges behind nodes; unstarted elements are skipped
+        for idx in sorted(self._timeline.started_before(time)):
+            kind, element = elements[idx]
+            self._draw_element(img, draw, kind, element, self._element_progress(kind, element, time))
         
-        frame_path = os.path.join(temp_dir, f"frame_{frame_number:04d}.png")
-        img.save(frame_path, quality=95, optimize=True)
-        return frame_path
+        return img
 
-    def _draw_node(self, draw: ImageDraw, node: Node, progress: float) -> None:
+    def _draw_node(self, img: Image.Image, draw: ImageDraw, node: Node, progress: float) -> None:
         """Draw a node with animation progress"""
         if not node.position:
             return
             
         x, y = node.position
         
-        # Calculate node size based on text
-        text_bbox = draw.textbbox((0, 0), node.label, font=self.font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        
-        # Add padding around text
-        PADDING = 20
-        w = max(80, text_width + PADDING * 2) * progress
-        h = max(80, text_height + PADDING * 2) * progress
+        # Node size fits the text, as measured for the layout
+        label = self._labels.get(node.label)
+        text_width = label.width
+        text_height = label.height
+        full_w, full_h = self.metrics.node_size(node.label)
         
-        # Draw node based on type with animation
-        if node.type == 'diamond':
-            points = [
-                (x, y - h/2),
-                (x + w/2, y),
-                (x, y + h/2),
-                (x - w/2, y)
-            ]
-            draw.polygon(points, fill=self.config.node_color)
-            for i in range(len(points)):
-                start = points[i]
-                end = points[(i + 1) % len(points)]
-                draw.line([start, end], fill=self.config.edge_color, 
-                         width=self.config.line_width)
-                         
-        elif node.type == 'round':
-            left = x - w/2
-            top = y - h/2
-            right = x + w/2
-            bottom = y + h/2
-            draw.ellipse([left, top, right, bottom], 
-                        outline=self.config.edge_color,
-                        fill=self.config.node_color, 
-                        width=self.config.line_width)
-                        
-        else:  # square or default
-            left = x - w/2
-            top = y - h/2
-            right = x + w/2
-            bottom = y + h/2
-            draw.rectangle([left, top, right, bottom], 
-                         outline=self.config.edge_color,
-                         fill=self.config.node_color, 
-                         width=self.config.line_width)
+        # Draw node based on type with animation. Finished nodes use exact
+        # geometry; popping-in nodes blit the nearest pre-rendered scale.
+        if progress < 1 and self._node_sprites is not None:
+            sprite = self._node_sprites.get(node.type, full_w, full_h, progress)
+            sprite.draw(img, (x, y))
+        else:
+            draw_node_shape(draw, node.type, x, y, full_w * progress, full_h * progress,
+                            self.config.node_color, self.config.edge_color,
+                            self.config.line_width)
         
         # Draw text with fade-in effect
         if progress > 0.5:
             text_progress = min(1, (progress - 0.5) * 2)
             text_x = x - text_width/2
             text_y = y - text_height/2
-            
-            # Handle color conversion and alpha
-            if isinstance(self.config.text_color, str):
-                if self.config.text_color == "black":
-                    text_color = (0, 0, 0, int(255 * text_progress))
-                else:
-                    text_color = (0, 0, 0, int(255 * text_progress))
-            else:
-                text_color = (*self.config.text_color[:3], int(255 * text_progress))
-                
-            draw.text((text_x, text_y), node.label,
-                     fill=text_color,
-                     font=self.font)
+            label.draw(draw, (text_x, text_y), self.text_rgb, text_progress)
 
     def _draw_edge(self, draw: ImageDraw, edge: Edge, progress: float) -> None:
         """Draw an edge with animation progress"""
-        if not edge.start_pos or not edge.end_pos:
+        geometry = self._geometry()
+        row = geometry.row(edge)
+        if not geometry.has_segment(row):
             return
-            
-        start = self._calculate_intersection(edge.start_pos, edge.end_pos, (80, 80), True)
-        end = self._calculate_intersection(edge.start_pos, edge.end_pos, (80, 80), False)
         
-        # Animate line drawing
-        current_x = start[0] + (end[0] - start[0]) * progress
-        current_y = start[1] + (end[1] - start[1]) * progress
+        # Animate line drawing along the routed polyline
+        points, direction = geometry.partial(row, progress)
+        current = points[-1]
         
         # Draw the line
-        draw.line([start[0], start[1], current_x, current_y], 
+        draw.line(points, 
                  fill=self.config.edge_color, 
-                 width=self.config.line_width)
+                 width=self.config.line_width,
+                 joint="curve" if len(points) > 2 else None)
         
         # Draw arrow head when edge is mostly drawn
         if progress > 0.8:
             arrow_progress = min(1, (progress - 0.8) * 5)
-            self._draw_arrow_head(draw, (current_x, current_y), end, arrow_progress)
+            draw.polygon(geometry.arrow_head(current, direction, 15 * arrow_progress),
+                         fill=self.config.edge_color)
         
-        # Draw edge label with fade in
+        # Draw edge label with fade in, centred on the drawn part of the edge
         if edge.label and progress > 0.5:
             label_progress = min(1, (progress - 0.5) * 2)
-            self._draw_edge_label(draw, edge.label, start, (current_x, current_y), label_progress)
-
-    def _calculate_intersection(self, start_pos: Tuple[float, float], 
-                              end_pos: Tuple[float, float],
-                              box_size: Tuple[float, float], 
-                              is_start: bool) -> Tuple[float, float]:
-        """Calculate where line intersects with node boundary"""
-        x1, y1 = start_pos
-        x2, y2 = end_pos
-        w, h = box_size
-        
-        angle = atan2(y2 - y1, x2 - x1)
-        center = start_pos if is_start else end_pos
-        
-        if abs(cos(angle)) > abs(sin(angle)):
-            x_offset = (w/2) * (1 if is_start else -1)
-            y_offset = x_offset * tan(angle)
-        else:
-            y_offset = (h/2) * (1 if is_start else -1)
-            x_offset = y_offset / tan(angle)
-            
-        return (center[0] + x_offset, center[1] + y_offset)
+            self._draw_edge_label(draw, edge.label, geometry.point_at(row, progress / 2), label_progress)
 
-    def _draw_arrow_head(self, draw: ImageDraw, current: Tuple[float, float], 
-                        end: Tuple[float, float], progress: float) -> None:
-        """Draw arrow head with animation progress"""
-        arrow_size = 15 * progress
-        angle = atan2(end[1] - current[1], end[0] - current[0])
-        
-        ax1 = current[0] - arrow_size * cos(angle - pi/6)
-        ay1 = current[1] - arrow_size * sin(angle - pi/6)
-        ax2 = current[0] - arrow_size * cos(angle + pi/6)
-        ay2 = current[1] - arrow_size * sin(angle + pi/6)
-        
-        draw.polygon([(current[0], current[1]), (ax1, ay1), (ax2, ay2)], 
-                    fill=self.config.edge_color)
+    def _geometry(self) -> EdgeGeometry:
+        """Edge geometry table, built on first use after scheduling"""
+        if self._edge_geometry is None:
+            self._edge_geometry = EdgeGeometry.build(self.edges, self._node_sizes())
+        return self._edge_geometry
+
+    def _node_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """Drawn box size of every node, as ``_draw_node`` sizes it"""
+        return {node_id: self.metrics.node_size(node.label) for node_id, node in self.nodes.items()}
 
-    def _draw_edge_label(self, draw: ImageDraw, label: str, start: Tuple[float, float], 
-                        current: Tuple[float, float], progress: float) -> None:
+    def _draw_edge_label(self, draw: ImageDraw, label: str, midpoint: Tuple[float, float], 
+                        progress: float) -> None:
         """Draw edge label with fade-in effect"""
-        mid_x = (start[0] + current[0]) / 2
-        mid_y = (start[1] + current[1]) / 2 - 15
+        mid_x = midpoint[0]
+        mid_y = midpoint[1] - 15
         
-        text_bbox = draw.textbbox((0, 0), label, font=self.font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
+        sprite = self._labels.get(label)
+        text_width = sprite.width
+        text_height = sprite.height
         
         label_x = mid_x - text_width/2
         label_y = mid_y - text_height/2
@@ -318,67 +330,65 @@ class MermaidAnimator:
         ], fill=self.config.background_color)
         
         # Draw text with fade-in
-        if isinstance(self.config.text_color, str):
-            if self.config.text_color == "black":
-                text_color = (0, 0, 0, int(255 * progress))
-            else:
-                text_color = (0, 0, 0, int(255 * progress))
-        else:
-            text_color = (*self.config.text_color[:3], int(255 * progress))
-            
-        draw.text((label_x, label_y), label, 
-                 fill=text_color,
-                 font=self.font)
+        sprite.draw(draw, (label_x, label_y), self.text_rgb, progress)
+
+    def _prepare_render(self) -> None:
+        """Index the scheduled timeline for rendering; call after scheduling"""
+        self._edge_geometry = EdgeGeometry.build(self.edges, self._node_sizes())
+        self._timeline = Timeline(self._element_intervals(self._draw_order()))
+        self._compositor = FrameCompositor(self) if self.config.static_layer else None
+
+    def _create_sink(self, output_filename: str):
+        """Create the frame sink selected by ``config.frame_sink``"""
+        return create_sink(
+            self.config.frame_sink,
+            output_filename,
+            self.config.width,
+            self.config.height,
+            self.config.fps,
+            buffer_size=self.config.frame_buffer_size,
+            frames_dir=self.config.frames_dir,
+            keep_frames=self.config.keep_frames
+        )
 
     def create_animation(self, output_filename: str = "animation.mp4") -> None:
         """Create the final animation video with sequential appearance"""
-        temp_dir = "output_frames"
-        
         # Calculate animation sequence and timing
         self._calculate_animation_sequence()
+        self._prepare_render()
         
-        # Setup temporary directory for frames
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        os.makedirs(temp_dir)
+        # Calculate total frames needed
+        total_frames = int(self._total_duration * self.config.fps)
+        logger.info(f"Generating {total_frames} frames for {self._total_duration:.2f} seconds of animation...")
         
-        try:
-            # Calculate total frames needed
-            total_frames = int(self._total_duration * self.config.fps)
-            logger.info(f"Generating {total_frames} frames for {self._total_duration:.2f} seconds of animation...")
-            
-            for frame in range(total_frames):
-                t = frame / self.config.fps
-                self._create_frame(t, frame, temp_dir)
-                
-                if frame % 10 == 0:  # Progress update every 10 frames
-                    logger.info(f"Progress: {frame}/{total_frames} frames ({(frame/total_frames*100):.1f}%)")
-            
-            # Combine frames into video using ffmpeg
-            logger.info("Creating video with ffmpeg...")
-            ffmpeg_cmd = [
-                'ffmpeg',
-                '-y',  # Overwrite output file if it exists
-                '-framerate', str(self.config.fps),
-                '-i', os.path.join(temp_dir, 'frame_%04d.png'),
-                '-c:v', 'libx264',
-                '-preset', 'slow',
-                '-crf', '18',
-                '-pix_fmt', 'yuv420p',
-                output_filename
-            ]
+        plan = self._frame_plan(total_frames)
+        self.skipped_frames = total_frames - len(plan)
+        if self.skipped_frames:
+            logger.info(f"Holding idle frames: rendering {len(plan)} of {total_frames} frames "
+                        f"({self.skipped_frames} skipped)")
+        
+        with self._create_sink(output_filename) as sink:
+            if self.config.workers > 1:
+                render_parallel(self, plan, total_frames, sink)
+            else:
+                self._render_frames(plan, total_frames, sink)
+
+    def _frame_plan(self, total_frames: int) -> List[Tuple[int, int]]:
+        """``(frame, count)`` pairs to render; idle stretches become one held frame"""
+        if not self.config.hold_frames:
+            return [(frame, 1) for frame in range(total_frames)]
+        
+        intervals = self._element_intervals(self._draw_order())
+        return build_frame_plan(intervals, total_frames, self.config.fps)
+
+    def _render_frames(self, plan: List[Tuple[int, int]], total_frames: int, sink) -> None:
+        """Render the frame plan in the calling process and feed it to ``sink``"""
+        for index, (frame, count) in enumerate(plan):
+            t = frame / self.config.fps
+            sink.write(self._render_frame(t), count)
             
-            try:
-                subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
-                logger.info(f"Animation saved to {output_filename}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"FFmpeg error: {e.stderr.decode()}")
-                raise RuntimeError("Failed to create video with FFmpeg")
-                
-        finally:
-            # Cleanup temporary files
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+            if index % 10 == 0:  # Progress update every 10 rendered frames
+                logger.info(f"Progress: {frame}/{total_frames} frames ({(frame/total_frames*100):.1f}%)")
 
     def save_layout_json(self, filename: str) -> None:
         """Save the current layout to a JSON file"""
@@ -401,7 +411,8 @@ class MermaidAnimator:
                     'start_pos': edge.start_pos,
                     'end_pos': edge.end_pos,
                     'sequence_number': edge.sequence_number,
-                    'animation_start_time': edge.animation_start_time
+                    'animation_start_time': edge.animation_start_time,
+                    'points': edge.points
                 } for edge in self.edges
             ],
             'config': {
@@ -450,7 +461,8 @@ class MermaidAnimator:
                 start_pos=tuple(edge_data['start_pos']) if edge_data['start_pos'] else None,
                 end_pos=tuple(edge_data['end_pos']) if edge_data['end_pos'] else None,
                 sequence_number=edge_data['sequence_number'],
-                animation_start_time=edge_data['animation_start_time']
+                animation_start_time=edge_data['animation_start_time'],
+                points=[tuple(p) for p in edge_data['points']] if edge_data.get('points') else None
             ))
             
         return animator
@@ -495,7 +507,8 @@ def create_example_animation():
         width=config.width,
         height=config.height,
         node_spacing=config.node_spacing,
-        rank_spacing=config.layer_spacing
+        rank_spacing=config.layer_spacing,
+        text_metrics=animator.metrics
     )
     
     parsed_graph = parser.parse(mermaid_code)
@@ -503,6 +516,8 @@ def create_example_animation():
     
     # Convert layout to animator format
     for node_id, layout_node in layout.nodes.items():
+        if layout_node.dummy:
+            continue
         animator.nodes[node_id] = Node(
             id=node_id,
             label=layout_node.label,
@@ -511,14 +526,15 @@ def create_example_animation():
             layer=layout_node.rank
         )
     
-    for edge in layout.edges:
+    for edge in layout.merged_edges():
         if edge.points and len(edge.points) >= 2:
             animator.edges.append(Edge(
                 start_node=edge.from_id,
                 end_node=edge.to_id,
                 label=edge.label,
                 start_pos=edge.points[0],
-                end_pos=edge.points[-1]
+                end_pos=edge.points[-1],
+                points=list(edge.points)
             ))
     
     # Create the animation
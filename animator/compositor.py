@@ -0,0 +1,126 @@
+# animator/compositor.py
+
+"""
+Static-layer compositing for MermaidAnimator frames.
+
+Elements that have finished animating look the same on every later frame, so
+they are baked once into a persistent background image. Each frame copies that
+background and draws only the elements that are still changing.
+
+Baking must not change the stacking order of the direct renderer (all edges,
+then all nodes, in list order). An element is therefore baked only once every
+earlier element whose bounds overlap it has been baked too, which keeps the
+output identical pixel for pixel.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+
+from PIL import Image, ImageDraw
+
+from animator.timeline import Timeline
+
+Bounds = Tuple[float, float, float, float]
+
+# Cell size of the spatial hash used to find overlapping elements
+GRID_CELL = 256
+
+
+class FrameCompositor:
+    """Renders frames from a static background plus in-progress elements"""
+
+    def __init__(self, animator):
+        self.animator = animator
+        self.elements = animator._draw_order()
+        self.timeline = Timeline(animator._element_intervals(self.elements))
+        blockers = self._find_blockers(
+            [animator._element_bounds(kind, obj) for kind, obj in self.elements])
+        self._blocker_count = [len(b) for b in blockers]
+        self._dependents: List[List[int]] = [[] for _ in self.elements]
+        for idx, element_blockers in enumerate(blockers):
+            for blocker in element_blockers:
+                self._dependents[blocker].append(idx)
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the baked background and start again from an empty canvas"""
+        config = self.animator.config
+        self.background = Image.new('RGB', (config.width, config.height),
+                                    config.background_color)
+        self._background_draw = ImageDraw.Draw(self.background)
+        self.timeline.reset()
+        self.baked = [False] * len(self.elements)
+        self._unbaked_blockers = list(self._blocker_count)
+        self._complete = [False] * len(self.elements)
+        # Complete elements still waiting for an overlapping earlier element
+        self._waiting: Set[int] = set()
+
+    @staticmethod
+    def _find_blockers(bounds: List[Optional[Bounds]]) -> List[List[int]]:
+        """For each element, list the earlier elements whose bounds overlap it"""
+        grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        blockers: List[List[int]] = []
+
+        for idx, box in enumerate(bounds):
+            if box is None:
+                blockers.append([])
+                continue
+
+            left, top, right, bottom = box
+            cells = [
+                (cx, cy)
+                for cx in range(int(left // GRID_CELL), int(right // GRID_CELL) + 1)
+                for cy in range(int(top // GRID_CELL), int(bottom // GRID_CELL) + 1)
+            ]
+
+            found = set()
+            for cell in cells:
+                for other in grid[cell]:
+                    if other in found:
+                        continue
+                    o_left, o_top, o_right, o_bottom = bounds[other]
+                    if o_left <= right and left <= o_right and o_top <= bottom and top <= o_bottom:
+                        found.add(other)
+                grid[cell].append(idx)
+
+            blockers.append(sorted(found))
+
+        return blockers
+
+    def _bake(self, completed: List[int]) -> None:
+        """Bake newly completed elements, plus any waiting elements they unblock"""
+        ready = []
+        for idx in completed:
+            self._complete[idx] = True
+            if self._unbaked_blockers[idx] == 0:
+                heapq.heappush(ready, idx)
+            else:
+                self._waiting.add(idx)
+
+        # Blockers come earlier in draw order, so baking in index order is safe
+        while ready:
+            idx = heapq.heappop(ready)
+            kind, obj = self.elements[idx]
+            self.animator._draw_element(self.background, self._background_draw, kind, obj, 1.0)
+            self.baked[idx] = True
+            self._waiting.discard(idx)
+            for dependent in self._dependents[idx]:
+                self._unbaked_blockers[dependent] -= 1
+                if self._unbaked_blockers[dependent] == 0 and self._complete[dependent]:
+                    heapq.heappush(ready, dependent)
+
+    def render(self, time: float) -> Image.Image:
+        """Render the frame at ``time``; times should normally increase"""
+        if time < self.timeline.time:
+            self.reset()
+        self._bake(self.timeline.advance(time))
+
+        img = self.background.copy()
+        draw = ImageDraw.Draw(img)
+        # Only animating elements and complete-but-blocked ones need drawing
+        for idx in sorted(self.timeline.active | self._waiting):
+            kind, obj = self.elements[idx]
+            progress = self.animator._element_progress(kind, obj, time)
+            self.animator._draw_element(img, draw, kind, obj, progress)
+        return img
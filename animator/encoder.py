@@ -0,0 +1,264 @@
+# animator/encoder.py
+
+"""
+Frame sinks that turn rendered frames into a video file.
+
+``FFmpegPipeSink`` streams raw RGB frames into an ffmpeg subprocess as they are
+drawn. ``PngSequenceSink`` keeps the original behaviour of writing numbered PNG
+files and encoding the directory afterwards; it is mainly useful for debugging.
+"""
+
+from abc import ABC, abstractmethod
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import logging
+from typing import List, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Encoder settings shared by both sinks
+X264_ARGS = ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18', '-pix_fmt', 'yuv420p']
+
+
+class FrameSink(ABC):
+    """Base class for frame consumers used by ``MermaidAnimator.create_animation``"""
+
+    def __init__(self, output_filename: str, width: int, height: int, fps: int):
+        self.output_filename = output_filename
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_written = 0
+
+    def __enter__(self) -> 'FrameSink':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self) -> None:
+        pass
+
+    def write(self, image: Image.Image, count: int = 1) -> None:
+        """Append a frame to the output, shown for ``count`` frame slots"""
+        self.write_raw(image.tobytes(), count)
+
+    @abstractmethod
+    def write_raw(self, data: bytes, count: int = 1) -> None:
+        """Append a frame given as packed RGB24 bytes, shown for ``count`` frame slots"""
+
+    def close(self) -> None:
+        """Finish the video; raises ``RuntimeError`` if encoding failed"""
+        pass
+
+    def abort(self) -> None:
+        """Discard the output after an error upstream"""
+        pass
+
+
+class FFmpegPipeSink(FrameSink):
+    """Streams raw RGB24 frames to ffmpeg over stdin.
+
+    Frames are handed to a writer thread through a bounded queue so drawing and
+    encoding overlap, while at most ``buffer_size`` frames are held in memory.
+    """
+
+    def __init__(self, output_filename: str, width: int, height: int, fps: int,
+                 buffer_size: int = 8):
+        super().__init__(output_filename, width, height, fps)
+        self.buffer_size = max(1, buffer_size)
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _command(self) -> List[str]:
+        return [
+            'ffmpeg',
+            '-y',  # Overwrite output file if it exists
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{self.width}x{self.height}',
+            '-framerate', str(self.fps),
+            '-i', '-',
+            *X264_ARGS,
+            self.output_filename
+        ]
+
+    def open(self) -> None:
+        # stderr goes to a file so a chatty ffmpeg can never block on a full pipe
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(
+                self._command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=self._stderr
+            )
+        except OSError as e:
+            self._stderr.close()
+            raise RuntimeError(f"Failed to start FFmpeg: {e}") from e
+
+        self._queue = queue.Queue(maxsize=self.buffer_size)
+        self._writer = threading.Thread(target=self._write_loop, name="ffmpeg-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self) -> None:
+        stdin = self._process.stdin
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if self._error is not None:
+                continue  # Drain the queue so the producer never blocks
+            try:
+                stdin.write(data)
+            except (BrokenPipeError, OSError) as e:
+                self._error = e
+
+    def write_raw(self, data: bytes, count: int = 1) -> None:
+        # Held frames are re-sent as the same bytes object, never re-rasterized
+        for _ in range(count):
+            if self._error is not None:
+                self._fail()
+            self._queue.put(data)
+            self.frames_written += 1
+
+    def _read_stderr(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors='replace').strip()
+
+    def _shutdown(self) -> int:
+        """Stop the writer thread, close stdin and wait for ffmpeg to exit"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        return self._process.wait()
+
+    def _fail(self) -> None:
+        self._shutdown()
+        stderr = self._read_stderr()
+        self._stderr.close()
+        logger.error(f"FFmpeg error: {stderr}")
+        raise RuntimeError("Failed to create video with FFmpeg")
+
+    def close(self) -> None:
+        returncode = self._shutdown()
+        if returncode != 0 or self._error is not None:
+            self._error = self._error or RuntimeError(f"ffmpeg exited with {returncode}")
+            self._fail()
+        self._stderr.close()
+        logger.info(f"Animation saved to {self.output_filename}")
+
+    def abort(self) -> None:
+        if self._process is None:
+            return
+        if self._writer is not None:
+            # Unblock the writer before killing the process it writes to
+            self._error = self._error or RuntimeError("aborted")
+            self._process.kill()
+            self._shutdown()
+        self._stderr.close()
+
+
+class PngSequenceSink(FrameSink):
+    """Writes every frame as a PNG and encodes the directory when closed.
+
+    This is the original rendering path, kept as an opt-in debug sink.
+    """
+
+    def __init__(self, output_filename: str, width: int, height: int, fps: int,
+                 frames_dir: str = "output_frames", keep_frames: bool = False):
+        super().__init__(output_filename, width, height, fps)
+        self.frames_dir = frames_dir
+        self.keep_frames = keep_frames
+
+    def open(self) -> None:
+        if os.path.exists(self.frames_dir):
+            shutil.rmtree(self.frames_dir)
+        os.makedirs(self.frames_dir)
+
+    def frame_path(self, frame_number: int) -> str:
+        return os.path.join(self.frames_dir, f"frame_{frame_number:04d}.png")
+
+    def write(self, image: Image.Image, count: int = 1) -> None:
+        first_path = self.frame_path(self.frames_written)
+        image.save(first_path, quality=95, optimize=True)
+        self.frames_written += 1
+
+        # Held frames are hard links (or copies) of the first file
+        for _ in range(count - 1):
+            path = self.frame_path(self.frames_written)
+            try:
+                os.link(first_path, path)
+            except OSError:
+                shutil.copyfile(first_path, path)
+            self.frames_written += 1
+
+    def write_raw(self, data: bytes, count: int = 1) -> None:
+        self.write(Image.frombytes('RGB', (self.width, self.height), data), count)
+
+    def close(self) -> None:
+        try:
+            logger.info("Creating video with ffmpeg...")
+            ffmpeg_cmd = [
+                'ffmpeg',
+                '-y',  # Overwrite output file if it exists
+                '-framerate', str(self.fps),
+                '-i', os.path.join(self.frames_dir, 'frame_%04d.png'),
+                *X264_ARGS,
+                self.output_filename
+            ]
+
+            try:
+                subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
+                logger.info(f"Animation saved to {self.output_filename}")
+            except subprocess.CalledProcessError as e:
+                logger.error(f"FFmpeg error: {e.stderr.decode()}")
+                raise RuntimeError("Failed to create video with FFmpeg")
+        finally:
+            self._cleanup()
+
+    def abort(self) -> None:
+        self._cleanup()
+
+    def _cleanup(self) -> None:
+        if not self.keep_frames and os.path.exists(self.frames_dir):
+            shutil.rmtree(self.frames_dir)
+
+
+class NullSink(FrameSink):
+    """Discards frames; used for profiling the renderer without an encoder"""
+
+    def write_raw(self, data: bytes, count: int = 1) -> None:
+        self.frames_written += count
+
+
+def create_sink(kind: str, output_filename: str, width: int, height: int, fps: int,
+                buffer_size: int = 8, frames_dir: str = "output_frames",
+                keep_frames: bool = False) -> FrameSink:
+    """Build the frame sink named by ``AnimationConfig.frame_sink``"""
+    if kind == "pipe":
+        return FFmpegPipeSink(output_filename, width, height, fps, buffer_size)
+    if kind == "png":
+        return PngSequenceSink(output_filename, width, height, fps, frames_dir, keep_frames)
+    if kind == "null":
+        return NullSink(output_filename, width, height, fps)
+    raise ValueError(f"Unknown frame sink: {kind!r} (expected 'pipe', 'png' or 'null')")
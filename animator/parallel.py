@@ -0,0 +1,78 @@
+# animator/parallel.py
+
+"""
+Parallel frame rendering for MermaidAnimator.
+
+The frame plan is cut into contiguous chunks which are rendered in a
+process pool. Each worker builds its own animator (and therefore its own font
+and static background layer) from the scheduled nodes and edges. Finished
+chunks are handed to the frame sink strictly in timeline order, and only a
+fixed number of chunks is in flight at once so memory stays bounded.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Animator owned by the current worker process
+_worker_animator = None
+
+
+def _init_worker(animator_cls, config, nodes, edges) -> None:
+    """Build a worker-local animator from the already scheduled elements"""
+    global _worker_animator
+    animator = animator_cls(config)
+    animator.nodes = nodes
+    animator.edges = edges
+    animator._prepare_render()
+    _worker_animator = animator
+
+
+def _render_chunk(entries: List[Tuple[int, int]]) -> List[Tuple[bytes, int]]:
+    """Render ``(frame, count)`` plan entries as ``(RGB24 bytes, count)`` pairs"""
+    fps = _worker_animator.config.fps
+    return [(_worker_animator._render_frame(frame / fps).tobytes(), count)
+            for frame, count in entries]
+
+
+def chunk_plan(plan: List[Tuple[int, int]], chunk_size: int) -> List[List[Tuple[int, int]]]:
+    """Split a frame plan into contiguous chunks of at most ``chunk_size`` rendered frames"""
+    chunk_size = max(1, chunk_size)
+    return [plan[start:start + chunk_size] for start in range(0, len(plan), chunk_size)]
+
+
+def render_parallel(animator, plan: List[Tuple[int, int]], total_frames: int, sink) -> None:
+    """Render a scheduled animator's frame plan in a process pool into ``sink``.
+
+    At most ``workers + 1`` chunks are pending at any time, so peak memory is
+    bounded by ``(workers + 1) * chunk_frames`` frames.
+    """
+    config = animator.config
+    chunks = deque(chunk_plan(plan, config.chunk_frames))
+    max_in_flight = config.workers + 1
+
+    with ProcessPoolExecutor(
+        max_workers=config.workers,
+        initializer=_init_worker,
+        initargs=(type(animator), config, animator.nodes, animator.edges)
+    ) as pool:
+        in_flight = deque()
+
+        def submit_next() -> None:
+            if chunks:
+                entries = chunks.popleft()
+                in_flight.append(pool.submit(_render_chunk, entries))
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while in_flight:
+            frames = in_flight.popleft().result()
+            submit_next()
+            for data, count in frames:
+                sink.write_raw(data, count)
+            logger.info(f"Progress: {sink.frames_written}/{total_frames} frames "
+                        f"({(sink.frames_written / total_frames * 100):.1f}%)")
@@ -0,0 +1,208 @@
+# animator/sprites.py
+
+"""
+Pre-rendered sprites reused across frames.
+
+``LabelCache`` shapes each label once with FreeType and keeps its bounds and an
+alpha mask, so labels are drawn by blitting the mask with a scaled alpha
+instead of re-shaping the text on every frame.
+
+``NodeSpriteCache`` does the same for node outlines while they pop in: the
+shape is rasterized at a fixed number of scale steps and the nearest step is
+blitted instead of running the polygon/ellipse geometry every frame.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import ceil, floor
+from typing import Optional, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+from layout.metrics import TextMetrics
+
+RGB = Tuple[int, int, int]
+Color = Union[str, RGB]
+
+
+def draw_node_shape(draw: ImageDraw.ImageDraw, shape: str, x: float, y: float,
+                    w: float, h: float, fill: Optional[Color], outline: Optional[Color],
+                    line_width: int) -> None:
+    """Draw a node body of size ``w`` x ``h`` centred on ``(x, y)``.
+
+    Either colour may be None to draw only the fill or only the outline.
+    """
+    if shape == 'diamond':
+        points = [
+            (x, y - h/2),
+            (x + w/2, y),
+            (x, y + h/2),
+            (x - w/2, y)
+        ]
+        if fill is not None:
+            draw.polygon(points, fill=fill)
+        if outline is not None:
+            for i in range(len(points)):
+                start = points[i]
+                end = points[(i + 1) % len(points)]
+                draw.line([start, end], fill=outline, width=line_width)
+        return
+
+    box = [x - w/2, y - h/2, x + w/2, y + h/2]
+    if shape == 'round':
+        draw.ellipse(box, outline=outline, fill=fill, width=line_width)
+    else:  # square or default
+        draw.rectangle(box, outline=outline, fill=fill, width=line_width)
+
+
+@dataclass
+class LabelSprite:
+    """Measured bounds and rasterized coverage mask of one label"""
+    bbox: Tuple[int, int, int, int]  # As returned by ``font.getbbox``
+    mask: Image.Image  # Mode 'L', covering ``bbox``
+
+    @property
+    def width(self) -> int:
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def height(self) -> int:
+        return self.bbox[3] - self.bbox[1]
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[float, float],
+             color: RGB, alpha: float = 1.0) -> None:
+        """Paint the label with its top-left text origin at ``xy``"""
+        mask = self.mask
+        if alpha < 1.0:
+            scale = max(0.0, alpha)
+            mask = mask.point([int(v * scale) for v in range(256)])
+        # Match where ImageDraw.text snaps glyphs: x rounds halves up, y down
+        position = (floor(xy[0] + 0.5) + self.bbox[0], ceil(xy[1] - 0.5) + self.bbox[1])
+        draw.bitmap(position, mask, fill=color)
+
+
+class LabelCache:
+    """LRU cache of ``LabelSprite`` for the font of a ``TextMetrics``.
+
+    Bounds come from the metrics, so labels the layout already measured are
+    not shaped twice. Masks are colour independent; the colour is applied when
+    the sprite is drawn, so one entry serves every text colour.
+    """
+
+    def __init__(self, metrics: TextMetrics, max_entries: int = 4096):
+        self.metrics = metrics
+        self.max_entries = max_entries
+        self._sprites: 'OrderedDict[tuple, LabelSprite]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def get(self, text: str) -> LabelSprite:
+        sprite = self._sprites.get(text)
+        if sprite is not None:
+            self._sprites.move_to_end(text)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        bbox = self.metrics.bbox(text)
+        mask = Image.new('L', (max(1, bbox[2] - bbox[0]), max(1, bbox[3] - bbox[1])), 0)
+        ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=self.metrics.font)
+        sprite = LabelSprite(bbox, mask)
+
+        self._sprites[text] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+
+@dataclass
+class NodeSprite:
+    """A node body pre-rendered in its final colours at one scale"""
+    offset: Tuple[int, int]  # Top-left corner relative to the node centre
+    image: Image.Image  # Mode 'RGB'
+    mask: Optional[Image.Image]  # Mode '1'; None when the sprite is fully opaque
+
+    @property
+    def nbytes(self) -> int:
+        size = self.image.width * self.image.height
+        return 3 * size + (size // 8 if self.mask is not None else 0)
+
+    def draw(self, image: Image.Image, center: Tuple[float, float]) -> None:
+        """Paste the sprite onto ``image`` centred on ``center``"""
+        left = floor(center[0] + 0.5) + self.offset[0]
+        top = floor(center[1] + 0.5) + self.offset[1]
+        # Shapes are not antialiased, so a 1-bit mask is exact and pastes
+        # much faster than an 'L' matte
+        image.paste(self.image, (left, top), self.mask)
+
+
+class NodeSpriteCache:
+    """LRU cache of node bodies pre-rasterized at ``steps`` quantized scale levels.
+
+    Sprites depend only on (shape, full width, full height, step), so nodes of
+    the same size share them. More steps give smoother pop-in at the cost of
+    memory; see ``nbytes``. At most ``max_entries`` sprites are kept.
+    """
+
+    def __init__(self, steps: int = 32, line_width: int = 3,
+                 fill: Color = "white", outline: Color = "black", max_entries: int = 1024):
+        self.steps = steps
+        self.line_width = line_width
+        self.fill = fill
+        self.outline = outline
+        self.max_entries = max_entries
+        self._sprites: 'OrderedDict[tuple, NodeSprite]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the cached sprites"""
+        return sum(sprite.nbytes for sprite in self._sprites.values())
+
+    def step(self, progress: float) -> int:
+        """Nearest scale step for ``progress`` in (0, 1]"""
+        return min(self.steps, max(1, round(progress * self.steps)))
+
+    def get(self, shape: str, width: float, height: float, progress: float) -> NodeSprite:
+        step = self.step(progress)
+        key = (shape, width, height, step)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(shape, width * step / self.steps, height * step / self.steps)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _render(self, shape: str, w: float, h: float) -> NodeSprite:
+        # Canvas with room for the outline; the node centre is the canvas centre
+        pad = self.line_width + 2
+        half_w = int(w / 2) + pad
+        half_h = int(h / 2) + pad
+        size = (2 * half_w + 1, 2 * half_h + 1)
+
+        image = Image.new('RGB', size, self.fill)
+        draw_node_shape(ImageDraw.Draw(image), shape, half_w, half_h, w, h,
+                        self.fill, self.outline, self.line_width)
+        mask = Image.new('1', size, 0)
+        draw_node_shape(ImageDraw.Draw(mask), shape, half_w, half_h, w, h,
+                        1, 1, self.line_width)
+
+        # Trim to the painted area; rectangles then need no mask at all
+        bbox = mask.getbbox() or (0, 0, 1, 1)
+        image = image.crop(bbox)
+        mask = mask.crop(bbox)
+        opaque = mask.getextrema()[0] != 0
+        return NodeSprite((bbox[0] - half_w, bbox[1] - half_h), image, None if opaque else mask)
@@ -0,0 +1,118 @@
+# animator/timeline.py
+
+"""
+Timeline helpers for MermaidAnimator.
+
+Every element animates over a half-open interval ``[start, end)``. Outside its
+interval an element's progress is constant (0 before, 1 after), so a frame can
+only differ from the previous one if some interval overlaps the time between
+them. ``build_frame_plan`` uses that to collapse idle stretches into a single
+rendered frame with a repeat count, and ``Timeline`` indexes the intervals so a
+frame only has to look at the elements that are animating.
+"""
+
+from bisect import bisect_left, bisect_right
+from math import floor
+from typing import Iterable, List, Set, Tuple
+
+
+def _count_frames_before(time: float, fps: int, inclusive: bool) -> int:
+    """Number of frames ``f >= 0`` with ``f / fps < time`` (``<=`` if inclusive)"""
+    def before(frame: int) -> bool:
+        return frame / fps <= time if inclusive else frame / fps < time
+
+    # Start from the float estimate and correct for rounding either way
+    frame = max(0, floor(time * fps))
+    while before(frame):
+        frame += 1
+    while frame > 0 and not before(frame - 1):
+        frame -= 1
+    return frame
+
+
+def build_frame_plan(intervals: Iterable[Tuple[float, float]], total_frames: int,
+                     fps: int) -> List[Tuple[int, int]]:
+    """Group frames that render identically.
+
+    Returns ``(frame, count)`` pairs in timeline order: ``frame`` is rendered
+    once and written ``count`` times. Frame ``f`` differs from ``f - 1`` only if
+    an interval satisfies ``start < f / fps`` and ``(f - 1) / fps < end``.
+    """
+    if total_frames <= 0:
+        return []
+
+    # Difference array over frames 1..total_frames-1 marking "changed" frames
+    changes = [0] * (total_frames + 1)
+    for start, end in intervals:
+        if end <= start:
+            continue
+        # First frame strictly after start, last frame whose predecessor is before end
+        first = max(1, _count_frames_before(start, fps, inclusive=True))
+        last = min(total_frames - 1, _count_frames_before(end, fps, inclusive=False))
+        if first <= last:
+            changes[first] += 1
+            changes[last + 1] -= 1
+
+    plan: List[Tuple[int, int]] = [(0, 1)]
+    active = 0
+    for frame in range(1, total_frames):
+        active += changes[frame]
+        if active > 0:
+            plan.append((frame, 1))
+        else:
+            held, count = plan[-1]
+            plan[-1] = (held, count + 1)
+    return plan
+
+
+class Timeline:
+    """Interval index over element animation times.
+
+    Elements are identified by their position in draw order. Start and end
+    times are kept as sorted arrays, and a cursor walks them as time moves
+    forward, so each step only touches the elements whose state changed.
+    """
+
+    def __init__(self, intervals: List[Tuple[float, float]]):
+        self.intervals = intervals
+        self._by_start = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+        self._by_end = sorted(range(len(intervals)), key=lambda i: intervals[i][1])
+        self._start_times = [intervals[i][0] for i in self._by_start]
+        self._end_times = [intervals[i][1] for i in self._by_end]
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def reset(self) -> None:
+        """Rewind the cursor to before the first element starts"""
+        self.time = float('-inf')
+        self.active: Set[int] = set()
+        self._started = 0  # Elements with start < time
+        self._completed = 0  # Elements with end <= time
+
+    def started_before(self, time: float) -> List[int]:
+        """Indices of every element with ``start < time`` (progress above 0)"""
+        return self._by_start[:bisect_left(self._start_times, time)]
+
+    def advance(self, time: float) -> List[int]:
+        """Move the cursor forward to ``time``.
+
+        Updates ``active`` (started but not complete) and returns the elements
+        that completed since the previous call, in draw order.
+        """
+        if time < self.time:
+            raise ValueError("Timeline cursor cannot move backwards; call reset() first")
+        self.time = time
+
+        started = bisect_left(self._start_times, time)
+        for idx in self._by_start[self._started:started]:
+            self.active.add(idx)
+        self._started = started
+
+        completed = bisect_right(self._end_times, time)
+        newly_completed = self._by_end[self._completed:completed]
+        self._completed = completed
+        for idx in newly_completed:
+            self.active.discard(idx)
+        return sorted(newly_completed)
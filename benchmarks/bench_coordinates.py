@@ -0,0 +1,72 @@
+# benchmarks/bench_coordinates.py
+
+"""Time the coordinate step: placement, clamping and edge routing.
+
+Lays out generated trees once, then times ``_assign_coordinates`` alone and
+followed by packing into a ``CompactLayout``, as ``compact=True`` does. The
+tidy-tree positions are computed once up front and reused, so the timings
+cover only the placement, clamping and routing loops.
+"""
+
+import argparse
+
+from benchmarks.common import best_of
+from layout.compact import CompactLayout
+from layout.layout import GraphLayout, LayoutEdge, LayoutNode, SugiyamaLayoutGenerator
+from parser.parser import MermaidParser
+
+
+def tree_code(num_nodes: int, fanout: int = 3) -> str:
+    return '\n'.join(['graph TD'] + [f'    n{i // fanout} --> n{i}' for i in range(1, num_nodes)])
+
+
+class PrecomputedTree(SugiyamaLayoutGenerator):
+    """Generator reusing cross-axis positions computed in advance"""
+
+    def __init__(self, natural, **options):
+        super().__init__(**options)
+        self.natural = natural
+
+    def _tidy_tree_natural(self, layout, forest, vertical):
+        return self.natural
+
+
+def layered(code: str):
+    """A layout that has been ranked and ordered, plus its forest"""
+    parsed_graph = MermaidParser().parse(code)
+    nodes = {
+        node_id: LayoutNode(id=node_id, label=node.label, type=node.type.value)
+        for node_id, node in parsed_graph.nodes.items()
+    }
+    edges = [LayoutEdge(from_id=edge.from_id, to_id=edge.to_id) for edge in parsed_graph.edges]
+    layout = GraphLayout(nodes, edges, 1920, 1080, parsed_graph.direction)
+    forest = SugiyamaLayoutGenerator()._layer_and_order(layout)
+    return layout, forest
+
+
+def place(generator: SugiyamaLayoutGenerator, layout: GraphLayout, forest, compact: bool) -> None:
+    """One coordinate step, packed into a ``CompactLayout`` if ``compact``"""
+    generator._assign_coordinates(layout, forest)
+    if compact:
+        CompactLayout.from_layout(layout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'mode':>10} {'ms':>8}")
+    for size in args.sizes:
+        layout, forest = layered(tree_code(size))
+        natural = SugiyamaLayoutGenerator()._tidy_tree_natural(layout, forest, vertical=True)
+        generator = PrecomputedTree(natural)
+        for mode in ('python', 'compact'):
+            elapsed = best_of(lambda: place(generator, layout, forest, mode == 'compact'),
+                              args.repeat)
+            print(f"{size:>8} {mode:>10} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
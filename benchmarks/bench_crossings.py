@@ -0,0 +1,36 @@
+# benchmarks/bench_crossings.py
+
+"""Time the accumulator-tree crossing counter.
+
+Counts crossings on random bipartite graphs of a few sizes with
+``bilayer_crossings``; tests/test_crossings.py checks the counts against brute
+force.
+"""
+
+import argparse
+import random
+
+from benchmarks.common import best_of
+from layout.crossings import bilayer_crossings
+
+
+def random_bipartite(upper_size: int, lower_size: int, num_edges: int, rng: random.Random):
+    return [(rng.randrange(upper_size), rng.randrange(lower_size)) for _ in range(num_edges)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1_000, 5_000, 50_000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'edges':>8} {'crossings':>11} {'s':>9}")
+    for size in args.sizes:
+        edges = random_bipartite(size, size, 2 * size, rng)
+        elapsed = best_of(lambda: bilayer_crossings(edges, size))
+        print(f"{len(edges):>8} {bilayer_crossings(edges, size):>11} {elapsed:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
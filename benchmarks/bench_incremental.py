@@ -0,0 +1,83 @@
+# benchmarks/bench_incremental.py
+
+"""Build a diagram up one edge at a time, seeded and from scratch.
+
+Lays out every prefix of a random graph's edge list, either from scratch or
+seeded with the previous frame's layout, and reports the total layout time,
+how many existing nodes changed rank or in-rank position between frames, how
+far they moved on the canvas (mean distance and moves over 5 px) and the
+crossings of the final frame.
+"""
+
+import argparse
+import math
+import random
+
+from benchmarks.common import best_of
+from layout.crossings import count_crossings
+from layout.layout import SugiyamaLayoutGenerator
+from parser.parser import MermaidParser
+
+
+def growing_edges(num_nodes: int, seed: int = 0):
+    """Edges of a random graph in the order a step-by-step build-up adds them"""
+    rng = random.Random(seed)
+    edges = []
+    for i in range(1, num_nodes):
+        edges.append((rng.randrange(max(0, i - 10), i), i))
+        if rng.random() < 0.3:
+            # Occasional cross link, sometimes pointing back up
+            edges.append(tuple(rng.sample(range(i + 1), 2)))
+    return edges
+
+
+def frames(edges):
+    """Parsed graph of every prefix of ``edges``"""
+    lines = ['graph TD']
+    for a, b in edges:
+        lines.append(f'    n{a} --> n{b}')
+        # A parser keeps what it has seen, so every frame needs a fresh one
+        yield MermaidParser().parse('\n'.join(lines))
+
+
+def build_up(graphs, seeded: bool):
+    """Lay out every frame; returns the last layout, the number of node moves
+    and the pixel distance of each existing node from its previous position"""
+    generator = SugiyamaLayoutGenerator()
+    layout, moves, distances = None, 0, []
+    for parsed_graph in graphs:
+        previous = layout
+        layout = generator.generate_layout(parsed_graph, previous=previous if seeded else None)
+        if previous is None:
+            continue
+        for node_id, node in previous.nodes.items():
+            if node.dummy:
+                continue
+            new = layout.nodes[node_id]
+            moves += (node.rank, node.order) != (new.rank, new.order)
+            distances.append(math.hypot(new.x - node.x, new.y - node.y))
+    return layout, moves, distances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'frames':>6} {'mode':>8} {'total ms':>9} {'moves':>6} "
+          f"{'mean px':>8} {'>5 px':>6} {'crossings':>9}")
+    for size in args.sizes:
+        graphs = list(frames(growing_edges(size)))
+        for mode in ('scratch', 'seeded'):
+            seeded = mode == 'seeded'
+            layout, moves, distances = build_up(graphs, seeded)
+            elapsed = best_of(lambda: build_up(graphs, seeded), args.repeat)
+            mean = sum(distances) / len(distances) if distances else 0.0
+            shifted = sum(distance > 5 for distance in distances)
+            print(f"{size:>6} {len(graphs):>6} {mode:>8} {elapsed * 1000:>9.1f} {moves:>6} "
+                  f"{mean:>8.1f} {shifted:>6} {count_crossings(layout):>9}")
+
+
+if __name__ == '__main__':
+    main()
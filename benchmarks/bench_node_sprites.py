@@ -0,0 +1,68 @@
+# benchmarks/bench_node_sprites.py
+
+"""Node pop-in drawing: direct geometry vs. NodeSpriteCache at several scale steps.
+
+Draws a grid of popping-in nodes of every shape at random progress values and
+reports the time per node, the sprite memory and how many pixels differ from
+direct drawing (the cost of quantizing the scale).
+"""
+
+import argparse
+import random
+
+from PIL import Image, ImageChops, ImageDraw
+
+from animator.sprites import NodeSpriteCache, draw_node_shape
+from benchmarks.common import best_of
+
+SHAPES = ['default', 'square', 'round', 'diamond']
+SIZES = [(80, 80), (120, 80), (180, 80), (260, 80)]
+
+
+def make_nodes(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    columns = 12
+    return [
+        (rng.choice(SHAPES), *rng.choice(SIZES),
+         100 + (i % columns) * 150, 100 + (i // columns) * 110, rng.random())
+        for i in range(count)
+    ]
+
+
+def render(nodes, sprites=None) -> Image.Image:
+    img = Image.new('RGB', (1920, 1080), 'white')
+    draw = ImageDraw.Draw(img)
+    for shape, w, h, x, y, progress in nodes:
+        if sprites is None:
+            draw_node_shape(draw, shape, x, y, w * progress, h * progress, 'white', 'black', 3)
+        else:
+            sprites.get(shape, w, h, progress).draw(img, (x, y))
+    return img
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=96)
+    parser.add_argument('--steps', type=int, nargs='+', default=[8, 16, 32, 64])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    nodes = make_nodes(args.nodes)
+    reference = render(nodes)
+    direct = best_of(lambda: render(nodes), args.repeat)
+    print(f"{'mode':<10} {'us/node':>8} {'speedup':>8} {'sprites':>8} {'KiB':>8} {'diff px':>8}")
+    print(f"{'direct':<10} {direct / len(nodes) * 1e6:>8.1f} {1.0:>7.2f}x {0:>8} {0:>8} {0:>8}")
+
+    for steps in args.steps:
+        sprites = NodeSpriteCache(steps)
+        # Warm-up fills the cache; a real render pays this once per diagram
+        render(nodes, sprites)
+        elapsed = best_of(lambda: render(nodes, sprites), args.repeat)
+        diff = ImageChops.difference(reference, render(nodes, sprites)).convert('L')
+        changed = diff.point(lambda value: 255 if value else 0).histogram()[255]
+        print(f"{f'steps={steps}':<10} {elapsed / len(nodes) * 1e6:>8.1f} {direct / elapsed:>7.2f}x "
+              f"{len(sprites):>8} {sprites.nbytes / 1024:>8.0f} {changed:>8}")
+
+
+if __name__ == '__main__':
+    main()
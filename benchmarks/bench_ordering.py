@@ -0,0 +1,58 @@
+# benchmarks/bench_ordering.py
+
+"""Time crossing minimization on large random DAGs.
+
+Ranks random DAGs and adds their dummy nodes once, then times
+``_optimize_crossings`` (median sweeps plus transpositions) from that initial
+order. Reports the node count including dummies and the crossings before and
+after.
+"""
+
+import argparse
+
+from benchmarks.bench_ranking import random_dag_code
+from benchmarks.common import best_of
+from layout.crossings import count_crossings
+from layout.layout import GraphLayout, LayoutEdge, LayoutNode, SugiyamaLayoutGenerator
+from parser.parser import MermaidParser
+
+
+def normalized(code: str, generator: SugiyamaLayoutGenerator) -> GraphLayout:
+    """A layout that has been ranked and given dummy nodes, but not ordered"""
+    parsed_graph = MermaidParser().parse(code)
+    nodes = {
+        node_id: LayoutNode(id=node_id, label=node.label, type=node.type.value)
+        for node_id, node in parsed_graph.nodes.items()
+    }
+    edges = [LayoutEdge(from_id=edge.from_id, to_id=edge.to_id) for edge in parsed_graph.edges]
+    layout = GraphLayout(nodes, edges, 1920, 1080, parsed_graph.direction)
+    generator._break_cycles(layout)
+    generator._assign_ranks(layout)
+    generator._normalize_edges(layout)
+    return layout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 2_000, 3_000, 5_000])
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'graph':>8} {'nodes':>7} {'before':>9} {'after':>8} {'seconds':>8}")
+    for size in args.sizes:
+        generator = SugiyamaLayoutGenerator()
+        layout = normalized(random_dag_code(size), generator)
+        initial = {rank: list(members) for rank, members in layout.ranks.items()}
+        before = count_crossings(layout)
+
+        def run():
+            layout.ranks.update((rank, list(members)) for rank, members in initial.items())
+            generator._optimize_crossings(layout)
+
+        elapsed = best_of(run, args.repeat)
+        print(f"{size:>8} {len(layout.nodes):>7} {before:>9} {count_crossings(layout):>8} "
+              f"{elapsed:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_ranking.py
+
+"""Compare longest-path, network-simplex and Coffman-Graham rank assignment.
+
+For the bundled examples and random DAGs, reports the most real nodes on one
+rank, how many dummy nodes each ranker leaves for ``_normalize_edges``, the
+crossings after ordering and the end-to-end parse + layout time.
+"""
+
+import argparse
+import random
+
+from collections import Counter
+
+from benchmarks.common import EXAMPLES, best_of
+from layout.crossings import count_crossings
+from layout.layout import SugiyamaLayoutGenerator
+from parser.parser import MermaidParser
+
+RANKERS = ('longest_path', 'network_simplex', 'coffman_graham')
+
+
+def random_dag_code(num_nodes: int, seed: int = 0, reach: int = 10) -> str:
+    """Mermaid code for a random DAG with ~1.5 edges per node, each spanning up to ``reach`` nodes"""
+    rng = random.Random(seed)
+    lines = ['graph TD']
+    for _ in range(num_nodes * 3 // 2):
+        a = rng.randrange(num_nodes - 1)
+        b = min(num_nodes - 1, a + rng.randint(1, reach))
+        lines.append(f'    n{a}[Node {a}] --> n{b}[Node {b}]')
+    return '\n'.join(lines)
+
+
+def measure(code: str, ranker: str, repeat: int):
+    def run():
+        parsed_graph = MermaidParser().parse(code)
+        return SugiyamaLayoutGenerator(ranker=ranker).generate_layout(parsed_graph)
+
+    layout = run()
+    widest = max(Counter(node.rank for node in layout.nodes.values() if not node.dummy).values())
+    dummies = sum(node.dummy for node in layout.nodes.values())
+    return widest, dummies, count_crossings(layout), best_of(run, repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [(name, get_code()) for name, get_code in EXAMPLES.items()]
+    cases += [(f'dag_{size}', random_dag_code(size)) for size in args.sizes]
+
+    print(f"{'graph':>12} {'ranker':>16} {'widest':>6} {'dummies':>8} {'crossings':>9} {'seconds':>8}")
+    for name, code in cases:
+        for ranker in RANKERS:
+            widest, dummies, crossings, elapsed = measure(code, ranker, args.repeat)
+            print(f"{name:>12} {ranker:>16} {widest:>6} {dummies:>8} {crossings:>9} {elapsed:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_restarts.py
+
+"""Crossings and layout time for multi-start crossing minimization.
+
+Lays out dense random DAGs with an increasing number of shuffled restarts and
+reports the crossings left and the parse + layout time, optionally with
+several worker processes or a time budget.
+"""
+
+import argparse
+
+from benchmarks.bench_ranking import random_dag_code
+from benchmarks.common import best_of
+from layout.crossings import count_crossings
+from layout.layout import SugiyamaLayoutGenerator
+from parser.parser import MermaidParser
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--restarts', type=int, nargs='+', default=[0, 4, 16])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--time-budget', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'restarts':>8} {'crossings':>9} {'ms':>8}")
+    for size in args.sizes:
+        # Short edges keep the graph in one dense component
+        code = random_dag_code(size, reach=6)
+        for restarts in args.restarts:
+            generator = SugiyamaLayoutGenerator(split_components=False, restarts=restarts,
+                                                seed=args.seed, workers=args.workers,
+                                                time_budget=args.time_budget)
+
+            def run():
+                return generator.generate_layout(MermaidParser().parse(code))
+
+            crossings = count_crossings(run())
+            elapsed = best_of(run, args.repeat)
+            print(f"{size:>6} {restarts:>8} {crossings:>9} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/bench_scheduling.py
+
+"""Micro-benchmark of MermaidAnimator._calculate_animation_sequence on synthetic graphs.
+
+Builds random DAGs with roughly two edges per node at 1k, 10k and 100k edges and
+times scheduling alone; nothing is laid out or drawn.
+"""
+
+import argparse
+import random
+
+from animator.animator import MermaidAnimator, AnimationConfig, Node, Edge
+from benchmarks.common import best_of
+
+
+def random_dag(num_edges: int, seed: int = 0) -> MermaidAnimator:
+    """Animator holding a random DAG with ``num_edges`` edges over ``num_edges // 2`` nodes"""
+    rng = random.Random(seed)
+    num_nodes = max(2, num_edges // 2)
+    animator = MermaidAnimator(AnimationConfig())
+    animator.nodes = {
+        f"n{i}": Node(id=f"n{i}", label=f"Node {i}", type="default")
+        for i in range(num_nodes)
+    }
+    for _ in range(num_edges):
+        a, b = sorted(rng.sample(range(num_nodes), 2))
+        animator.edges.append(Edge(start_node=f"n{a}", end_node=f"n{b}", label=""))
+    return animator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'edges':>8} {'nodes':>8} {'seconds':>9} {'us/edge':>8}")
+    for size in args.sizes:
+        animator = random_dag(size)
+        elapsed = best_of(animator._calculate_animation_sequence, args.repeat)
+        print(f"{size:>8} {len(animator.nodes):>8} {elapsed:>9.4f} {elapsed / size * 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
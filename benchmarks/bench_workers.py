@@ -0,0 +1,34 @@
+# benchmarks/bench_workers.py
+
+"""Frame rendering speedup vs. AnimationConfig.workers on the MermaidExamples graphs.
+
+Frames go to the 'null' sink so only rendering (and frame transfer between
+processes) is measured, not ffmpeg.
+"""
+
+import argparse
+import os
+
+from benchmarks.common import EXAMPLES, build_animator, best_of
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpus})
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'example':<12} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+    for name, get_code in EXAMPLES.items():
+        baseline = None
+        for workers in args.workers:
+            animator = build_animator(get_code(), frame_sink='null', workers=workers)
+            elapsed = best_of(lambda: animator.create_animation(os.devnull), args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:<12} {workers:>7} {elapsed:>9.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
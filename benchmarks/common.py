@@ -0,0 +1,49 @@
+# benchmarks/common.py
+
+"""Helpers shared by the benchmark scripts. Run them from the repository root,
+e.g. ``python -m benchmarks.bench_workers``."""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from animator.animator import MermaidAnimator, AnimationConfig
+from examples.examples import MermaidExamples
+from parser.parser import MermaidParser
+from layout.layout import SugiyamaLayoutGenerator
+from main import convert_layout_to_animator
+
+# Keep progress logging out of the timings
+logging.disable(logging.INFO)
+
+EXAMPLES = {
+    'economy_lr': MermaidExamples.get_economy_lr,
+    'economy_td': MermaidExamples.get_economy_td,
+}
+
+
+def build_animator(mermaid_code: str, **config) -> MermaidAnimator:
+    """Parse, lay out and convert a diagram into a ready-to-render animator"""
+    parsed_graph = MermaidParser().parse(mermaid_code)
+    animator = MermaidAnimator(AnimationConfig(**config))
+    layout = SugiyamaLayoutGenerator(width=1920, height=1080, node_spacing=150, rank_spacing=250,
+                                     text_metrics=animator.metrics).generate_layout(parsed_graph)
+    animator.nodes, animator.edges = convert_layout_to_animator(layout)
+    return animator
+
+
+@contextmanager
+def timer(results: list):
+    """Append the elapsed wall time of the block to ``results``"""
+    start = time.perf_counter()
+    yield
+    results.append(time.perf_counter() - start)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Best wall time of ``repeat`` calls to ``fn``"""
+    times = []
+    for _ in range(repeat):
+        with timer(times):
+            fn()
+    return min(times)
@@ -0,0 +1,169 @@
+# layout/cache.py
+
+"""
+On-disk cache of finished layouts.
+
+Rendering the same diagram again with another theme or frame rate repeats the
+whole layout pipeline for an identical result. ``LayoutCache`` stores each
+finished layout as a ``CompactLayout`` archive named after a hash of
+everything the result depends on: the parsed graph and the generator options
+that affect placement. Entries are evicted least recently used first once the
+directory grows past ``max_bytes``.
+
+Several processes may share one directory: entries are written to a temporary
+file and renamed into place, and a file another process wrote is picked up on
+the next ``get``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+from layout.compact import CompactLayout, require_numpy
+
+if TYPE_CHECKING:
+    from layout.layout import GraphLayout
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to the layout algorithms should invalidate old entries
+CACHE_VERSION = 4
+
+# Generator options the finished layout depends on; ``workers`` and ``compact``
+# change how it is computed or returned, not the result
+KEY_OPTIONS = (
+    'width', 'height', 'node_spacing', 'rank_spacing', 'ranker', 'coordinates',
+    'split_components', 'tree_layout', 'restarts', 'seed', 'max_rank_width',
+)
+
+
+def layout_key(parsed_graph, generator) -> str:
+    """Content hash of a parsed graph and the generator options that shape its layout.
+
+    Node and edge order is kept rather than sorted away: it decides ties in
+    ranking and ordering, so reordered input can lay out differently.
+    """
+    content = {
+        'version': CACHE_VERSION,
+        'options': {name: getattr(generator, name) for name in KEY_OPTIONS},
+        'font_size': getattr(generator.text_metrics, 'font_size', None),
+        'direction': parsed_graph.direction,
+        'nodes': [[node_id, node.label, node.type.value]
+                  for node_id, node in parsed_graph.nodes.items()],
+        'edges': [[edge.from_id, edge.to_id, edge.label] for edge in parsed_graph.edges],
+    }
+    canonical = json.dumps(content, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LayoutCache:
+    """Size-bounded LRU cache of finished layouts in ``directory``"""
+
+    SUFFIX = '.npz'
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        require_numpy("LayoutCache")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Entry sizes by key, least recently used first; file times carry the
+        # recency over from earlier runs
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        paths = sorted(self.directory.glob('*' + self.SUFFIX), key=lambda p: p.stat().st_mtime)
+        for path in paths:
+            self._entries[path.stem] = path.stat().st_size
+        self._size = sum(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + self.SUFFIX)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._size,
+        }
+
+    def get(self, key: str) -> Optional[CompactLayout]:
+        """The cached layout for ``key``, or None on a miss"""
+        path = self._path(key)
+        try:
+            layout = CompactLayout.load(path)
+        except FileNotFoundError:
+            self._forget(key)
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            # Truncated or foreign file; drop it and lay out again
+            logger.warning(f"Discarding unreadable layout cache entry {path.name}: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(path)
+        if key not in self._entries:
+            self._entries[key] = path.stat().st_size
+            self._size += self._entries[key]
+        self._entries.move_to_end(key)
+        return layout
+
+    def put(self, key: str, layout: Union['GraphLayout', CompactLayout]) -> None:
+        """Store a finished layout, evicting old entries past ``max_bytes``"""
+        compact = layout if isinstance(layout, CompactLayout) else CompactLayout.from_layout(layout)
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                compact.save(file)
+            os.replace(temp, self._path(key))
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+        self._forget(key)
+        self._entries[key] = self._path(key).stat().st_size
+        self._size += self._entries[key]
+        self._evict()
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _evict(self) -> None:
+        # The newest entry stays even if it alone exceeds the budget
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        self._size -= self._entries.pop(key, 0)
+
+    def _remove(self, key: str) -> None:
+        self._forget(key)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,388 @@
+# layout/compact.py
+
+"""
+Column-oriented storage for finished layouts.
+
+A ``GraphLayout`` keeps one dataclass instance per node and edge plus string
+ids in every rank list, which adds up to hundreds of MB for generated graphs
+with 100k nodes. ``CompactLayout`` holds the same data in NumPy columns: node
+ids are interned to row numbers, numeric fields are arrays, edges are index
+arrays with a CSR out-adjacency, and routed points and dummy chains are packed
+CSR style (``offsets[e]:offsets[e + 1]`` are the rows of edge ``e``).
+
+``nodes``, ``edges``, ``ranks`` and ``merged_edges()`` mirror ``GraphLayout``
+through lightweight views, so ``save_json`` and the animator accept either
+form. Node coordinates, sizes, rank and order can be written through the
+views; edges are read-only. ``save`` and ``load`` round-trip the columns
+through an ``.npz`` archive without pickling.
+
+NumPy is optional for the rest of the package. This module holds the one
+guarded import: ``np`` is None without NumPy, and other modules call
+``require_numpy`` before anything that cannot do without it.
+"""
+
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from operator import attrgetter
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+if TYPE_CHECKING:
+    from layout.layout import GraphLayout, LayoutEdge
+
+Point = Tuple[float, float]
+
+# Columns written by ``CompactLayout.save``; the out-adjacency is rebuilt on load
+_ARRAYS = (
+    'type_codes', 'x', 'y', 'widths', 'heights', 'rank', 'order', 'dummy',
+    'edge_from', 'edge_to', 'edge_reversed', 'point_offsets', 'points',
+    'chain_offsets', 'chain_nodes', 'rank_keys', 'rank_offsets', 'rank_members',
+)
+_STRINGS = ('ids', 'labels', 'type_names', 'edge_labels')
+
+
+def require_numpy(feature: str) -> None:
+    """Raise ``ImportError`` naming ``feature`` if NumPy is not installed"""
+    if np is None:
+        raise ImportError(f"{feature} requires numpy; install it with: pip install numpy")
+
+
+def _column(name: str, cast):
+    """Property reading and writing one row of the array column ``name``"""
+    def get(self):
+        return cast(getattr(self._store, name)[self._row])
+
+    def set(self, value):
+        getattr(self._store, name)[self._row] = value
+
+    return property(get, set)
+
+
+class NodeView:
+    """One node of a ``CompactLayout``, with the attributes of ``LayoutNode``"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'CompactLayout', row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._store.ids[self._row]
+
+    @property
+    def label(self) -> str:
+        return self._store.labels[self._row]
+
+    @property
+    def type(self) -> str:
+        return self._store.type_names[self._store.type_codes[self._row]]
+
+    x = _column('x', float)
+    y = _column('y', float)
+    width = _column('widths', float)
+    height = _column('heights', float)
+    rank = _column('rank', int)
+    order = _column('order', int)
+    dummy = property(lambda self: bool(self._store.dummy[self._row]))
+
+    def __repr__(self) -> str:
+        return f"NodeView(id={self.id!r}, x={self.x}, y={self.y}, rank={self.rank})"
+
+
+class EdgeView:
+    """One edge of a ``CompactLayout``, with the attributes of ``LayoutEdge``"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'CompactLayout', row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def from_id(self) -> str:
+        return self._store.ids[self._store.edge_from[self._row]]
+
+    @property
+    def to_id(self) -> str:
+        return self._store.ids[self._store.edge_to[self._row]]
+
+    @property
+    def label(self) -> str:
+        return self._store.edge_labels[self._row]
+
+    @property
+    def points(self) -> List[Point]:
+        return self._store.edge_points(self._row)
+
+    @property
+    def dummy_nodes(self) -> List[str]:
+        store = self._store
+        chain = store.chain_nodes[store.chain_offsets[self._row]:store.chain_offsets[self._row + 1]]
+        return [store.ids[row] for row in chain.tolist()]
+
+    @property
+    def reversed(self) -> bool:
+        return bool(self._store.edge_reversed[self._row])
+
+    def __repr__(self) -> str:
+        return f"EdgeView(from_id={self.from_id!r}, to_id={self.to_id!r})"
+
+
+class _NodeMap(Mapping):
+    """Read-only ``Dict[str, LayoutNode]`` look-alike over the node columns"""
+
+    def __init__(self, store: 'CompactLayout'):
+        self._store = store
+
+    def __getitem__(self, node_id: str) -> NodeView:
+        return NodeView(self._store, self._store.index[node_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids)
+
+    def __len__(self) -> int:
+        return len(self._store.ids)
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._store.index
+
+
+class _EdgeList(Sequence):
+    """Read-only ``List[LayoutEdge]`` look-alike over the edge columns"""
+
+    def __init__(self, store: 'CompactLayout'):
+        self._store = store
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("edge index out of range")
+        return EdgeView(self._store, row)
+
+    def __len__(self) -> int:
+        return len(self._store.edge_from)
+
+
+class _RankMap(Mapping):
+    """Read-only ``Dict[int, List[str]]`` look-alike over the rank CSR"""
+
+    def __init__(self, store: 'CompactLayout'):
+        self._store = store
+
+    def __getitem__(self, rank: int) -> List[str]:
+        store = self._store
+        slot = int(np.searchsorted(store.rank_keys, rank))
+        if slot == len(store.rank_keys) or store.rank_keys[slot] != rank:
+            raise KeyError(rank)
+        members = store.rank_members[store.rank_offsets[slot]:store.rank_offsets[slot + 1]]
+        return [store.ids[row] for row in members.tolist()]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._store.rank_keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._store.rank_keys)
+
+
+def _offsets(counts) -> 'np.ndarray':
+    """CSR offsets from per-row counts"""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+class CompactLayout:
+    """A finished layout stored as NumPy columns; see the module docstring"""
+
+    def __init__(self, width: float, height: float, direction: str = "TD"):
+        require_numpy("CompactLayout")
+        self.width = width
+        self.height = height
+        self.direction = direction
+
+        # Nodes, one row each
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.labels: List[str] = []
+        self.type_names: List[str] = []
+        self.type_codes = np.zeros(0, dtype=np.uint8)
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.widths = np.zeros(0)
+        self.heights = np.zeros(0)
+        self.rank = np.zeros(0, dtype=np.int32)
+        self.order = np.zeros(0, dtype=np.int32)
+        self.dummy = np.zeros(0, dtype=bool)
+
+        # Edges, one row each, in layout order
+        self.edge_from = np.zeros(0, dtype=np.int32)
+        self.edge_to = np.zeros(0, dtype=np.int32)
+        self.edge_labels: List[str] = []
+        self.edge_reversed = np.zeros(0, dtype=bool)
+        self.point_offsets = np.zeros(1, dtype=np.int64)
+        self.points = np.zeros((0, 2))
+        self.chain_offsets = np.zeros(1, dtype=np.int64)
+        self.chain_nodes = np.zeros(0, dtype=np.int32)
+
+        # Out-adjacency: edges leaving node r are out_edges[out_offsets[r]:out_offsets[r + 1]]
+        self.out_offsets = np.zeros(1, dtype=np.int64)
+        self.out_edges = np.zeros(0, dtype=np.int32)
+
+        # Ranks in ascending order; members of rank_keys[k] in drawing order
+        self.rank_keys = np.zeros(0, dtype=np.int32)
+        self.rank_offsets = np.zeros(1, dtype=np.int64)
+        self.rank_members = np.zeros(0, dtype=np.int32)
+
+        self.nodes = _NodeMap(self)
+        self.edges = _EdgeList(self)
+        self.ranks = _RankMap(self)
+
+    @classmethod
+    def from_layout(cls, layout: 'GraphLayout') -> 'CompactLayout':
+        """Pack a ``GraphLayout`` (or copy another ``CompactLayout``)"""
+        compact = cls(layout.width, layout.height, layout.direction)
+        nodes = list(layout.nodes.values())
+        count = len(nodes)
+
+        def column(name: str, dtype) -> np.ndarray:
+            return np.fromiter(map(attrgetter(name), nodes), dtype=dtype, count=count)
+
+        compact.ids = list(map(attrgetter('id'), nodes))
+        compact.index = dict(zip(compact.ids, range(count)))
+        compact.labels = list(map(attrgetter('label'), nodes))
+        types = list(map(attrgetter('type'), nodes))
+        type_codes = {name: code for code, name in enumerate(dict.fromkeys(types))}
+        compact.type_codes = np.fromiter(map(type_codes.__getitem__, types), dtype=np.uint8,
+                                         count=count)
+        compact.type_names = list(type_codes)
+        compact.x = column('x', np.float64)
+        compact.y = column('y', np.float64)
+        compact.widths = column('width', np.float64)
+        compact.heights = column('height', np.float64)
+        compact.rank = column('rank', np.int32)
+        compact.order = column('order', np.int32)
+        compact.dummy = column('dummy', bool)
+
+        def rows(node_ids, count: int = -1) -> np.ndarray:
+            return np.fromiter(map(compact.index.__getitem__, node_ids), dtype=np.int32,
+                               count=count)
+
+        edges = list(layout.edges)
+        compact.edge_from = rows(map(attrgetter('from_id'), edges), len(edges))
+        compact.edge_to = rows(map(attrgetter('to_id'), edges), len(edges))
+        compact.edge_labels = list(map(attrgetter('label'), edges))
+        compact.edge_reversed = np.fromiter(map(attrgetter('reversed'), edges), dtype=bool,
+                                            count=len(edges))
+        point_lists = list(map(attrgetter('points'), edges))
+        compact.point_offsets = _offsets(list(map(len, point_lists)))
+        compact.points = np.fromiter(
+            chain.from_iterable(chain.from_iterable(point_lists)), dtype=np.float64,
+            count=2 * int(compact.point_offsets[-1])
+        ).reshape(-1, 2)
+        chains = list(map(attrgetter('dummy_nodes'), edges))
+        compact.chain_offsets = _offsets(list(map(len, chains)))
+        compact.chain_nodes = rows(chain.from_iterable(chains), int(compact.chain_offsets[-1]))
+
+        compact.index_edges()
+
+        rank_keys = sorted(layout.ranks.keys())
+        members = [layout.ranks[rank] for rank in rank_keys]
+        compact.rank_keys = np.array(rank_keys, dtype=np.int32)
+        compact.rank_offsets = _offsets(list(map(len, members)))
+        compact.rank_members = rows(chain.from_iterable(members), int(compact.rank_offsets[-1]))
+        return compact
+
+    def to_layout(self) -> 'GraphLayout':
+        """Unpack into dataclasses, e.g. to keep editing a finished layout"""
+        from layout.layout import GraphLayout, LayoutEdge, LayoutNode
+
+        nodes = {
+            node_id: LayoutNode(
+                id=node_id,
+                label=self.labels[row],
+                type=self.type_names[code],
+                x=x, y=y, width=width, height=height,
+                rank=rank, order=order, dummy=dummy
+            )
+            for row, (node_id, code, x, y, width, height, rank, order, dummy) in enumerate(zip(
+                self.ids, self.type_codes.tolist(), self.x.tolist(), self.y.tolist(),
+                self.widths.tolist(), self.heights.tolist(), self.rank.tolist(),
+                self.order.tolist(), self.dummy.tolist()))
+        }
+        edges = [
+            LayoutEdge(
+                from_id=edge.from_id,
+                to_id=edge.to_id,
+                label=edge.label,
+                points=edge.points,
+                dummy_nodes=edge.dummy_nodes,
+                reversed=edge.reversed
+            )
+            for edge in self.edges
+        ]
+        layout = GraphLayout(nodes, edges, self.width, self.height, self.direction)
+        for rank, members in self.ranks.items():
+            layout.ranks[rank] = members
+        return layout
+
+    def save(self, file: Union[str, BinaryIO]) -> None:
+        """Write the columns to an uncompressed ``.npz`` archive"""
+        arrays = {name: getattr(self, name) for name in _ARRAYS}
+        arrays.update({name: np.array(getattr(self, name), dtype=str) for name in _STRINGS})
+        arrays['canvas'] = np.array([self.width, self.height])
+        arrays['direction'] = np.array(self.direction)
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO]) -> 'CompactLayout':
+        """Read a layout written by ``save``"""
+        with np.load(file, allow_pickle=False) as archive:
+            width, height = archive['canvas'].tolist()
+            compact = cls(width, height, str(archive['direction']))
+            for name in _ARRAYS:
+                setattr(compact, name, archive[name])
+            for name in _STRINGS:
+                setattr(compact, name, archive[name].tolist())
+        compact.index = dict(zip(compact.ids, range(len(compact.ids))))
+        compact.index_edges()
+        return compact
+
+    def index_edges(self) -> None:
+        """Rebuild the out-adjacency after edge endpoints change"""
+        self.out_offsets = _offsets(np.bincount(self.edge_from, minlength=len(self.ids)))
+        self.out_edges = np.argsort(self.edge_from, kind='stable').astype(np.int32)
+
+    def edge_points(self, row: int) -> List[Point]:
+        """Routed points of edge ``row``"""
+        start, end = self.point_offsets[row], self.point_offsets[row + 1]
+        return [tuple(point) for point in self.points[start:end].tolist()]
+
+    def successors(self, node_id: str) -> List[str]:
+        """Heads of the edges leaving ``node_id``, in layout order"""
+        row = self.index[node_id]
+        edges = self.out_edges[self.out_offsets[row]:self.out_offsets[row + 1]]
+        return [self.ids[head] for head in self.edge_to[edges].tolist()]
+
+    def merged_edges(self) -> List['LayoutEdge']:
+        """Edges between real nodes, with dummy-node chains joined into one polyline"""
+        from layout.layout import merge_dummy_chains
+
+        ids = self.ids
+        tails = [ids[row] for row in self.edge_from.tolist()]
+        heads = [ids[row] for row in self.edge_to.tolist()]
+        dummies = {ids[row] for row in np.flatnonzero(self.dummy).tolist()}
+        return merge_dummy_chains(tails, heads, dummies, self.edge_labels, self.edge_points,
+                                  self.edge_reversed.tolist())
+
+    def nbytes(self) -> int:
+        """Bytes held by the array columns (strings and the id index not included)"""
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
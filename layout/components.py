@@ -0,0 +1,62 @@
+# layout/components.py
+
+"""
+Splitting a graph into independent pieces and packing them back together.
+
+Disconnected sub-diagrams (for example the combined ``.mmd`` files produced by
+``json-editor/combine_mermaid.py``) are laid out one weakly connected
+component at a time, so crossing minimization never works on the union. The
+finished components are then arranged on the canvas with a shelf packer.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+def weakly_connected_components(nodes: Iterable[str],
+                                edges: Iterable[Tuple[str, str]]) -> List[List[str]]:
+    """Group ``nodes`` into weakly connected components.
+
+    Components are ordered by their first node, and nodes keep their input
+    order within a component.
+    """
+    nodes = list(nodes)
+    parent = {node: node for node in nodes}
+
+    def find(node: str) -> str:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for tail, head in edges:
+        a, b = find(tail), find(head)
+        if a != b:
+            parent[a] = b
+
+    components: Dict[str, List[str]] = {}
+    for node in nodes:
+        components.setdefault(find(node), []).append(node)
+    return list(components.values())
+
+
+def shelf_pack(sizes: List[Tuple[float, float]], max_width: float,
+               gap: float = 0) -> Tuple[List[Tuple[float, float]], float, float]:
+    """Pack rectangles into rows ("shelves") no wider than ``max_width``.
+
+    Rectangles are placed tallest first, left to right, starting a new shelf
+    below the tallest one so far when the next would overflow (next-fit
+    decreasing height). Returns the top-left corner of each rectangle in input
+    order and the width and height of the packed area.
+    """
+    positions: List[Tuple[float, float]] = [(0.0, 0.0)] * len(sizes)
+    x = y = shelf_height = width = 0.0
+    for idx in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[idx]
+        if x > 0 and x + w > max_width:
+            y += shelf_height + gap
+            x = shelf_height = 0.0
+        positions[idx] = (x, y)
+        width = max(width, x + w)
+        shelf_height = max(shelf_height, h)
+        x += w + gap
+    return positions, width, y + shelf_height
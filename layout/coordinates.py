@@ -0,0 +1,168 @@
+# layout/coordinates.py
+
+"""
+Brandes–Köpf coordinate assignment.
+
+Positions nodes along the axis perpendicular to the ranks ("cross axis") so
+that each node lines up with the median of its neighbours where possible, as
+in Brandes and Köpf, "Fast and Simple Horizontal Coordinate Assignment"
+(2001). Four alignments are computed (aligning with the rank above or below,
+sweeping from either end), compacted into blocks with a longest-path pass and
+balanced by averaging the two median candidates. Chains of dummy nodes are
+kept vertical whenever they do not cross, so long edges come out straight.
+
+Everything here works on node ids and rank lists and runs in O(V + E).
+"""
+
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, Set, Tuple
+
+Neighbours = Dict[str, List[str]]
+
+
+def _type1_conflicts(layers: List[List[str]], above: Neighbours,
+                     dummies: Set[str], position: Dict[str, int]) -> Set[Tuple[str, str]]:
+    """Edges that cross an inner segment (an edge between two dummy nodes).
+
+    Inner segments win, so long edges stay straight; conflicting edges are
+    excluded from the alignment.
+    """
+    conflicts: Set[Tuple[str, str]] = set()
+    for upper, layer in zip(layers, layers[1:]):
+        k0 = 0
+        scan = 0
+        for i, node in enumerate(layer):
+            inner = None
+            if node in dummies:
+                inner = next((u for u in above.get(node, ()) if u in dummies), None)
+            if inner is None and i != len(layer) - 1:
+                continue
+            k1 = position[inner] if inner is not None else len(upper)
+            for scanned in layer[scan:i + 1]:
+                for u in above.get(scanned, ()):
+                    if (position[u] < k0 or position[u] > k1) and not (
+                            u in dummies and scanned in dummies):
+                        conflicts.add((min(u, scanned), max(u, scanned)))
+            scan = i + 1
+            k0 = k1
+    return conflicts
+
+
+def _vertical_alignment(layers: List[List[str]], neighbours: Neighbours,
+                        conflicts: Set[Tuple[str, str]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Group nodes into vertical blocks, each aligned with a median neighbour"""
+    root = {}
+    align = {}
+    position = {}
+    for layer in layers:
+        for i, node in enumerate(layer):
+            root[node] = node
+            align[node] = node
+            position[node] = i
+
+    for layer in layers:
+        previous = -1
+        for node in layer:
+            adjacent = sorted(neighbours.get(node, ()), key=position.__getitem__)
+            if not adjacent:
+                continue
+            mid = (len(adjacent) - 1) / 2
+            for i in range(int(mid), int(mid + 0.5) + 1):
+                w = adjacent[i]
+                if (align[node] == node and previous < position[w]
+                        and (min(node, w), max(node, w)) not in conflicts):
+                    align[w] = node
+                    align[node] = root[node] = root[w]
+                    previous = position[w]
+    return root, align
+
+
+def _horizontal_compaction(layers: List[List[str]], root: Dict[str, str],
+                           separation: Callable[[str, str], float]) -> Dict[str, float]:
+    """Place blocks as far left as their separation constraints allow, then
+    pull each block right toward its successors to close needless gaps"""
+    successors: Dict[str, Dict[str, float]] = defaultdict(dict)
+    predecessors: Dict[str, Dict[str, float]] = defaultdict(dict)
+    blocks = list(dict.fromkeys(root[node] for layer in layers for node in layer))
+    for layer in layers:
+        for left, right in zip(layer, layer[1:]):
+            a, b = root[left], root[right]
+            gap = max(separation(left, right), successors[a].get(b, 0))
+            successors[a][b] = gap
+            predecessors[b][a] = gap
+
+    # Topological order of the block graph
+    indegree = {block: len(predecessors[block]) for block in blocks}
+    ready = deque(block for block in blocks if indegree[block] == 0)
+    order = []
+    while ready:
+        block = ready.popleft()
+        order.append(block)
+        for successor in successors[block]:
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                ready.append(successor)
+
+    xs: Dict[str, float] = {}
+    for block in order:
+        xs[block] = max((xs[p] + gap for p, gap in predecessors[block].items()), default=0.0)
+    for block in reversed(order):
+        if successors[block]:
+            limit = min(xs[s] - gap for s, gap in successors[block].items())
+            xs[block] = max(xs[block], limit)
+
+    return {node: xs[root[node]] for layer in layers for node in layer}
+
+
+def brandes_kopf(layers: List[List[str]], above: Neighbours, below: Neighbours,
+                 dummies: Set[str], size: Dict[str, float],
+                 separation: Callable[[str, str], float],
+                 bend_long_edges: bool = False) -> Dict[str, float]:
+    """Cross-axis centre of every node in ``layers``.
+
+    ``layers`` lists the ranks top to bottom, each in final order; ``above``
+    and ``below`` map nodes to their neighbours in the adjacent ranks.
+    ``size`` is each node's extent along the cross axis and ``separation``
+    the minimum centre distance between two neighbours in a rank. With
+    ``bend_long_edges`` a dummy node never aligns with a real one, so a
+    long edge holds no column open above or below its end nodes.
+    """
+    position = {node: i for layer in layers for i, node in enumerate(layer)}
+    conflicts = _type1_conflicts(layers, above, dummies, position)
+    if bend_long_edges:
+        conflicts.update((min(u, node), max(u, node)) for node, upper in above.items()
+                         for u in upper if (u in dummies) != (node in dummies))
+
+    alignments = []
+    for vertical in ('up', 'down'):
+        ordered = layers if vertical == 'up' else layers[::-1]
+        neighbours = above if vertical == 'up' else below
+        for horizontal in ('left', 'right'):
+            if horizontal == 'right':
+                ordered = [layer[::-1] for layer in ordered]
+            root, _ = _vertical_alignment(ordered, neighbours, conflicts)
+            xs = _horizontal_compaction(ordered, root, separation)
+            if horizontal == 'right':
+                xs = {node: -x for node, x in xs.items()}
+            alignments.append((horizontal, xs))
+
+    # Anchor every alignment to the narrowest one, on its own side
+    def extent(xs: Dict[str, float]) -> Tuple[float, float]:
+        return (min(x - size[node] / 2 for node, x in xs.items()),
+                max(x + size[node] / 2 for node, x in xs.items()))
+
+    narrowest = min((xs for _, xs in alignments), key=lambda xs: extent(xs)[1] - extent(xs)[0])
+    target_min = min(narrowest.values())
+    target_max = max(narrowest.values())
+    for i, (horizontal, xs) in enumerate(alignments):
+        delta = target_min - min(xs.values()) if horizontal == 'left' else \
+            target_max - max(xs.values())
+        if delta:
+            alignments[i] = (horizontal, {node: x + delta for node, x in xs.items()})
+
+    # Average the two middle candidates
+    result = {}
+    for node in position:
+        candidates = sorted(xs[node] for _, xs in alignments)
+        result[node] = (candidates[1] + candidates[2]) / 2
+    return result
@@ -0,0 +1,192 @@
+# layout/incremental.py
+
+"""
+Seeding a layout from the previous frame of a growing diagram.
+
+Step-by-step animations lay out the same diagram again after every added node
+or edge. Laying out each frame from scratch lets the ranking and the crossing
+sweeps reshuffle nodes that did not change, so they jump between frames, and
+pays the full sweep cost every time. ``LayoutSeed`` records where every node
+(and every dummy node, keyed by its edge) ended up last time;
+``seeded_ranks`` keeps those ranks and only moves nodes that the new edges
+force down, and ``anchored_positions`` keeps nodes near where the previous
+frame drew them.
+"""
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+from layout.acyclic import feedback_arc_set
+
+# An edge by its drawn endpoints and how many identical edges came before it
+EdgeKey = Tuple[str, str, int]
+
+
+def edge_keys(edges) -> List[EdgeKey]:
+    """Keys of merged edges in order; reversed edges are keyed as drawn"""
+    seen: Dict[Tuple[str, str], int] = defaultdict(int)
+    keys = []
+    for edge in edges:
+        ends = (edge.to_id, edge.from_id) if edge.reversed else (edge.from_id, edge.to_id)
+        keys.append(ends + (seen[ends],))
+        seen[ends] += 1
+    return keys
+
+
+@dataclass
+class LayoutSeed:
+    """Ranks and in-rank order of a previous layout"""
+
+    ranks: Dict[str, int] = field(default_factory=dict)
+    orders: Dict[str, int] = field(default_factory=dict)
+    # Order of each dummy node of an edge, by rank
+    chains: Dict[EdgeKey, Dict[int, int]] = field(default_factory=dict)
+    # Canvas centre of every real node
+    positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_layout(cls, layout) -> 'LayoutSeed':
+        """Seed from a finished ``GraphLayout`` or ``CompactLayout``"""
+        seed = cls()
+        for node_id, node in layout.nodes.items():
+            if not node.dummy:
+                seed.ranks[node_id] = node.rank
+                seed.orders[node_id] = node.order
+                seed.positions[node_id] = (node.x, node.y)
+        merged = layout.merged_edges()
+        for key, edge in zip(edge_keys(merged), merged):
+            if edge.dummy_nodes:
+                seed.chains[key] = {
+                    layout.nodes[node_id].rank: layout.nodes[node_id].order
+                    for node_id in edge.dummy_nodes
+                }
+        return seed
+
+    def coverage(self, node_ids) -> float:
+        """Fraction of ``node_ids`` the seed knows about"""
+        node_ids = list(node_ids)
+        if not node_ids:
+            return 0.0
+        return sum(node_id in self.ranks for node_id in node_ids) / len(node_ids)
+
+
+def anchored_positions(ranks: Iterable[List[str]], cross: Dict[str, float],
+                       previous: Dict[str, float], size: Dict[str, float],
+                       low: float, high: float) -> Dict[str, float]:
+    """Cross-axis positions that stay as close as they can to ``previous``.
+
+    ``cross`` is the fresh placement. Each rank keeps its order and the gaps
+    ``cross`` leaves between neighbours, or the smaller gap two neighbours
+    had in ``previous``; within that, nodes with a
+    previous position are pulled toward it and the others toward their
+    ``cross`` position, shifted by the mean drift of the rest of their rank
+    (least squares, by pool-adjacent-violators). A rank is then moved inside
+    ``low``..``high``, or left as ``cross`` places it if it no longer fits.
+    """
+    result = dict(cross)
+    for members in ranks:
+        kept = [previous[n] - cross[n] for n in members if n in previous]
+        if not kept:
+            continue
+        drift = sum(kept) / len(kept)
+
+        # With offsets o_i summing the gaps, x_i - o_i must not decrease;
+        # neighbours drawn closer together last time may stay that close
+        offsets = [0.0]
+        for a, b in zip(members, members[1:]):
+            gap = cross[b] - cross[a]
+            if a in previous and b in previous and previous[a] < previous[b]:
+                gap = min(gap, previous[b] - previous[a])
+            offsets.append(offsets[-1] + gap)
+        targets = [(previous[n] if n in previous else cross[n] + drift) - o
+                   for n, o in zip(members, offsets)]
+        xs = [z + o for z, o in zip(_non_decreasing(targets), offsets)]
+
+        left = min(x - size[n] / 2 for n, x in zip(members, xs))
+        right = max(x + size[n] / 2 for n, x in zip(members, xs))
+        if right - left > high - low:
+            continue
+        shift = max(low - left, min(0.0, high - right))
+        for n, x in zip(members, xs):
+            result[n] = x + shift
+    return result
+
+
+def _non_decreasing(values: List[float]) -> List[float]:
+    """Least-squares non-decreasing fit of ``values``"""
+    # Blocks of pooled values as [total, count]
+    blocks: List[List[float]] = []
+    for value in values:
+        blocks.append([value, 1])
+        while len(blocks) > 1 and blocks[-2][0] * blocks[-1][1] > blocks[-1][0] * blocks[-2][1]:
+            total, count = blocks.pop()
+            blocks[-1][0] += total
+            blocks[-1][1] += count
+    fitted = []
+    for total, count in blocks:
+        fitted.extend([total / count] * int(count))
+    return fitted
+
+
+def seeded_ranks(nodes: List[str], edges: List[Tuple[str, str]],
+                 seeded: Dict[str, int]) -> Tuple[Dict[str, int], Set[int], int]:
+    """Ranks that keep seeded nodes in place, the edges to reverse and the shift.
+
+    New nodes go one rank below their deepest ranked predecessor, or just
+    above their highest ranked successor. Every edge is then oriented down
+    the ranking; edges left within one rank push their head (and whatever
+    hangs below it) down, so only the part of the graph the change touches
+    moves. Ranks are shifted to start at 0; the shift is returned so seeded
+    ranks can be compared with the new ones.
+    """
+    predecessors: Dict[str, List[str]] = defaultdict(list)
+    successors: Dict[str, List[str]] = defaultdict(list)
+    for tail, head in edges:
+        if tail != head:
+            predecessors[head].append(tail)
+            successors[tail].append(head)
+
+    rank = {node: seeded[node] for node in nodes if node in seeded}
+    for node in nodes:
+        if node in rank:
+            continue
+        above = [rank[p] for p in predecessors[node] if p in rank]
+        below = [rank[s] for s in successors[node] if s in rank]
+        if above:
+            rank[node] = max(above) + 1
+        else:
+            rank[node] = max(0, min(below) - 1) if below else 0
+
+    reversed_edges = {
+        idx for idx, (tail, head) in enumerate(edges)
+        if tail != head and rank[tail] > rank[head]
+    }
+
+    # Edges within a rank point down once their head moves; reverse enough of
+    # them that doing so cannot go round a cycle
+    flat = [idx for idx, (tail, head) in enumerate(edges) if tail != head and rank[tail] == rank[head]]
+    flat_edges = [edges[idx] for idx in flat]
+    flat_nodes = [node for edge in flat_edges for node in edge]
+    for i in feedback_arc_set(flat_nodes, flat_edges):
+        reversed_edges.add(flat[i])
+
+    down: Dict[str, List[str]] = defaultdict(list)
+    for idx, (tail, head) in enumerate(edges):
+        if tail != head:
+            if idx in reversed_edges:
+                tail, head = head, tail
+            down[tail].append(head)
+
+    queue = deque(edges[idx][1] if idx in reversed_edges else edges[idx][0] for idx in flat)
+    while queue:
+        node = queue.popleft()
+        for head in down[node]:
+            if rank[head] <= rank[node]:
+                rank[head] = rank[node] + 1
+                queue.append(head)
+
+    top = min(rank.values(), default=0)
+    if top:
+        rank = {node: r - top for node, r in rank.items()}
+    return rank, reversed_edges, top
@@ -1,13 +1,37 @@
 # layout/layout.py
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Literal
-from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Literal, Union
+from collections import defaultdict, deque
+from itertools import repeat
+from statistics import median
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import json
+import multiprocessing
+import random
+import time
+
+from layout.acyclic import feedback_arc_set
+from layout.cache import LayoutCache, layout_key
+from layout.compact import CompactLayout
+from layout.components import shelf_pack, weakly_connected_components
+from layout.coordinates import brandes_kopf
+from layout.crossings import adjacent_neighbours, count_crossings, rank_positions
+from layout.incremental import LayoutSeed, anchored_positions, edge_keys, seeded_ranks
+from layout.metrics import DEFAULT_NODE_SIZE, TextMetrics
+from layout.ranking import coffman_graham, network_simplex
+from layout.tree import tidy_tree
 
 logger = logging.getLogger(__name__)
 
+# Width and height of the dummy nodes that carry long edges across ranks
+DUMMY_SIZE = 10
+
+# Roots and per-node child lists of a forest, in drawing order
+Forest = Tuple[List[str], Dict[str, List[str]]]
+
 @dataclass
 class LayoutNode:
     id: str
@@ -15,8 +39,8 @@ class LayoutNode:
     type: str
     x: float = 0
     y: float = 0
-    width: float = 80
-    height: float = 80
+    width: float = DEFAULT_NODE_SIZE
+    height: float = DEFAULT_NODE_SIZE
     rank: int = 0
     order: int = 0
     dummy: bool = False
@@ -28,6 +52,7 @@ class LayoutEdge:
     label: str = ""
     points: List[Tuple[float, float]] = field(default_factory=list)
     dummy_nodes: List[str] = field(default_factory=list)
+    reversed: bool = False  # Flipped to break a cycle while layering
 
 @dataclass
 class GraphLayout:
@@ -38,22 +63,111 @@ class GraphLayout:
     direction: str = "TD"  # Added direction field
     ranks: Dict[int, List[str]] = field(default_factory=lambda: defaultdict(list))
 
+    def merged_edges(self) -> List[LayoutEdge]:
+        """Edges between real nodes, with dummy-node chains joined into one polyline"""
+        edges = self.edges
+        return merge_dummy_chains(
+            [edge.from_id for edge in edges], [edge.to_id for edge in edges],
+            {node_id for node_id, node in self.nodes.items() if node.dummy},
+            [edge.label for edge in edges], lambda row: edges[row].points,
+            [edge.reversed for edge in edges])
+
+
+def merge_dummy_chains(tails: Sequence[str], heads: Sequence[str], dummies: Set[str],
+                       labels: Sequence[str], points: Callable[[int], List[Tuple[float, float]]],
+                       reversed_rows: Sequence[bool]) -> List[LayoutEdge]:
+    """Join chain segments, given as parallel per-edge columns, into one
+    ``LayoutEdge`` per edge between real nodes"""
+    # Every dummy node has exactly one outgoing chain segment
+    dummy_out = {tail: row for row, tail in enumerate(tails) if tail in dummies}
+    
+    merged = []
+    for row, tail in enumerate(tails):
+        if tail in dummies:
+            continue
+        
+        polyline = list(points(row))
+        dummy_nodes = []
+        label = labels[row]
+        current = row
+        while heads[current] in dummies:
+            dummy_nodes.append(heads[current])
+            current = dummy_out[heads[current]]
+            polyline.extend(points(current)[1:])
+            label = label or labels[current]
+        
+        merged.append(LayoutEdge(
+            from_id=tail,
+            to_id=heads[current],
+            label=label,
+            points=polyline,
+            dummy_nodes=dummy_nodes,
+            reversed=reversed_rows[row]
+        ))
+    return merged
+
 class SugiyamaLayoutGenerator:
     """Implements Sugiyama's algorithm for layered graph drawing with direction support"""
     
     def __init__(self, width: float = 1920, height: float = 1080,
-                 node_spacing: float = 150, rank_spacing: float = 250):
+                 node_spacing: float = 150, rank_spacing: float = 250,
+                 ranker: Literal["longest_path", "network_simplex", "coffman_graham"] = "longest_path",
+                 coordinates: Literal["brandes_kopf", "even"] = "brandes_kopf",
+                 split_components: bool = True, workers: int = 1,
+                 tree_layout: bool = True, compact: bool = False,
+                 cache: Optional[LayoutCache] = None, restarts: int = 0,
+                 seed: int = 0, time_budget: Optional[float] = None,
+                 text_metrics: Optional[TextMetrics] = None,
+                 max_rank_width: Optional[int] = None):
+        if ranker not in ("longest_path", "network_simplex", "coffman_graham"):
+            raise ValueError(f"Unknown ranker: {ranker!r} "
+                             f"(expected 'longest_path', 'network_simplex' or 'coffman_graham')")
+        if coordinates not in ("brandes_kopf", "even"):
+            raise ValueError(f"Unknown coordinates: {coordinates!r} (expected 'brandes_kopf' or 'even')")
+        if restarts < 0:
+            raise ValueError(f"restarts must be >= 0, got {restarts}")
+        if max_rank_width is not None and max_rank_width < 1:
+            raise ValueError(f"max_rank_width must be >= 1, got {max_rank_width}")
         self.width = width
         self.height = height
         self.node_spacing = node_spacing
         self.rank_spacing = rank_spacing
+        self.ranker = ranker
+        self.coordinates = coordinates
+        self.split_components = split_components
+        self.workers = workers  # Processes laying out components; 1 lays them out in-process
+        self.tree_layout = tree_layout  # Tidy-tree fast path for forests
+        self.compact = compact  # Return a CompactLayout instead of dataclasses
+        self.cache = cache  # Finished layouts from earlier runs, by graph content
+        self.restarts = restarts  # Extra crossing minimizations from shuffled orders
+        self.seed = seed  # Seeds the shuffles, so restarts are reproducible
+        self.time_budget = time_budget  # Seconds for all restarts together; None is unlimited
+        self.text_metrics = text_metrics  # Sizes nodes to fit their labels; None keeps the default size
+        self.max_rank_width = max_rank_width  # Nodes per rank for coffman_graham; None fits the canvas
         self.dummy_counter = 0
         self.direction = "TD"  # Default direction
+        self.deadline: Optional[float] = None  # time.monotonic() at which restarts stop
 
-    def generate_layout(self, parsed_graph) -> GraphLayout:
-        """Main method to generate layout"""
+    def generate_layout(self, parsed_graph,
+                        previous: Union[GraphLayout, CompactLayout, None] = None
+                        ) -> Union[GraphLayout, CompactLayout]:
+        """Main method to generate layout.
+
+        ``previous`` is the previous frame of a diagram growing step by step;
+        its nodes keep their ranks and order. Seeded layouts bypass the cache.
+        """
+        seed = LayoutSeed.from_layout(previous) if previous is not None else None
         # Get direction from parsed graph
         self.direction = parsed_graph.direction
+        # One budget for the whole graph, however many components it has
+        self.deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        
+        key = layout_key(parsed_graph, self) if self.cache is not None and seed is None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"Layout cache hit {key[:12]}")
+                return cached if self.compact else cached.to_layout()
         
         # Initialize layout
         nodes = {
@@ -64,6 +178,9 @@ class SugiyamaLayoutGenerator:
             )
             for node_id, node in parsed_graph.nodes.items()
         }
+        if self.text_metrics is not None:
+            for node in nodes.values():
+                node.width, node.height = self.text_metrics.node_size(node.label)
         
         edges = [
             LayoutEdge(
@@ -77,50 +194,460 @@ class SugiyamaLayoutGenerator:
         # Create graph layout
         layout = GraphLayout(nodes, edges, self.width, self.height, self.direction)
         
-        # Apply Sugiyama algorithm steps
+        components = weakly_connected_components(
+            layout.nodes, [(edge.from_id, edge.to_id) for edge in layout.edges])
+        if self.split_components and len(components) > 1:
+            self._layout_components(layout, components, seed)
+        else:
+            # Apply Sugiyama algorithm steps
+            forest = self._layer_and_order(layout, seed)
+            self._assign_coordinates(layout, forest, seed)
+        
+        packed = CompactLayout.from_layout(layout) if self.compact else None
+        if key is not None:
+            self.cache.put(key, packed if packed is not None else layout)
+        return packed if self.compact else layout
+
+    def _layer_and_order(self, layout: GraphLayout,
+                         seed: Optional[LayoutSeed] = None) -> Optional[Forest]:
+        """Steps 0-3: everything before coordinates are assigned.
+
+        Forests skip straight to ``_rank_forest`` and are returned so the
+        coordinate step can lay them out as trees; anything else goes through
+        the full Sugiyama pipeline and returns None. A ``seed`` covering most
+        nodes replaces cycle breaking, ranking and crossing sweeps with their
+        incremental versions.
+        """
+        MIN_SEED_COVERAGE = 0.5
+        
+        # Depth is the rank of a tidy tree, which a width bound would break
+        forest = self._find_forest(layout) \
+            if self.tree_layout and self.ranker != "coffman_graham" else None
+        if forest is not None:
+            self._rank_forest(layout, forest)
+            return forest
+        
+        if seed is not None and seed.coverage(layout.nodes) >= MIN_SEED_COVERAGE:
+            top = self._seeded_ranks(layout, seed)
+            self._normalize_edges(layout)
+            self._seeded_order(layout, seed, top)
+            return None
+        
+        self._break_cycles(layout)
         self._assign_ranks(layout)
         self._normalize_edges(layout)
         self._optimize_crossings(layout)
-        self._assign_coordinates(layout)
+        return None
+
+    def _max_rank_width(self, layout: GraphLayout) -> int:
+        """``max_rank_width``, or as many nodes as fit across the canvas at full spacing"""
+        MARGIN = 100
         
-        return layout
+        if self.max_rank_width is not None:
+            return self.max_rank_width
+        vertical = layout.direction in ["TD", "BT"]
+        usable = (self.width if vertical else self.height) - 2 * MARGIN
+        return max(1, int(usable // self.node_spacing))
 
-    def _assign_ranks(self, layout: GraphLayout) -> None:
-        """Step 1: Assign ranks to nodes using longest path layering"""
-        # Find nodes with no incoming edges
-        incoming_edges = {e.to_id for e in layout.edges}
-        roots = [nid for nid in layout.nodes.keys() if nid not in incoming_edges]
+    def _typical_node_size(self, layout: GraphLayout, across: bool) -> float:
+        """Median size of the real nodes across their rank, or along the ranks"""
+        vertical = layout.direction in ["TD", "BT"]
+        sizes = [
+            node.width if across == vertical else node.height
+            for node in layout.nodes.values() if not node.dummy
+        ]
+        return median(sizes) if sizes else DEFAULT_NODE_SIZE
+
+    def _dummy_width(self, layout: GraphLayout) -> float:
+        """Share of a typical real node's footprint a dummy node takes up across its rank"""
+        node_gap = max(0.0, self.node_spacing - DEFAULT_NODE_SIZE)
+        node_size = self._typical_node_size(layout, across=True)
+        return (DUMMY_SIZE + node_gap / 2) / (node_size + node_gap)
+
+    def _max_ranks(self, layout: GraphLayout) -> int:
+        """As many ranks as fit along the canvas with a gap between node boxes"""
+        MARGIN = 100
         
-        if not roots:
-            roots = [next(iter(layout.nodes.keys()))]
-            logger.warning(f"No root nodes found, using {roots[0]} as root")
+        vertical = layout.direction in ["TD", "BT"]
+        usable = (self.height if vertical else self.width) - 2 * MARGIN
+        node_gap = max(0.0, self.node_spacing - DEFAULT_NODE_SIZE)
+        node_size = self._typical_node_size(layout, across=False)
+        return max(1, int(usable // (node_size + node_gap / 2)))
+
+    def _find_forest(self, layout: GraphLayout) -> Optional[Forest]:
+        """Roots and child lists if the graph is a forest, else None.
+
+        A forest has no node with two incoming edges and every node is
+        reachable from a node with none; self-loops and parallel edges rule
+        it out.
+        """
+        parent = {}
+        children = defaultdict(list)
+        for edge in layout.edges:
+            if edge.from_id == edge.to_id or edge.to_id in parent:
+                return None
+            parent[edge.to_id] = edge.from_id
+            children[edge.from_id].append(edge.to_id)
         
-        # Initialize ranks
+        roots = [node_id for node_id in layout.nodes if node_id not in parent]
+        # Without a cycle, every node hangs below one of the roots
+        reached = len(roots)
+        stack = list(roots)
+        while stack:
+            node_id = stack.pop()
+            reached += len(children[node_id])
+            stack.extend(children[node_id])
+        if reached < len(layout.nodes):
+            return None
+        return roots, dict(children)
+
+    def _rank_forest(self, layout: GraphLayout, forest: Forest) -> None:
+        """Steps 1-3 for a forest: rank by depth, order by edge order.
+
+        Edges always join adjacent ranks and, with children kept in edge
+        order, never cross, so no dummy nodes or crossing sweeps are needed.
+        """
+        roots, children = forest
         ranks = defaultdict(list)
-        assigned = set()
+        queue = deque((root, 0) for root in roots)
+        while queue:
+            node_id, rank = queue.popleft()
+            layout.nodes[node_id].rank = rank
+            ranks[rank].append(node_id)
+            queue.extend((child, rank + 1) for child in children.get(node_id, ()))
+        layout.ranks = ranks
+
+    def _layout_components(self, layout: GraphLayout, components: List[List[str]],
+                           seed: Optional[LayoutSeed] = None) -> None:
+        """Lay out each weakly connected component on its own and pack the results"""
+        edges_by_component = [[] for _ in components]
+        component_of = {node_id: i for i, nodes in enumerate(components) for node_id in nodes}
+        for edge in layout.edges:
+            edges_by_component[component_of[edge.from_id]].append(edge)
         
-        def assign_rank(node_id: str, rank: int) -> None:
-            node = layout.nodes[node_id]
-            if node_id in assigned:
-                node.rank = max(node.rank, rank)
-            else:
-                node.rank = rank
-                assigned.add(node_id)
+        sublayouts = [
+            GraphLayout({node_id: layout.nodes[node_id] for node_id in nodes}, component_edges,
+                        layout.width, layout.height, layout.direction)
+            for nodes, component_edges in zip(components, edges_by_component)
+        ]
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                sublayouts = list(executor.map(self._layout_component, sublayouts, repeat(seed)))
+        else:
+            sublayouts = [self._layout_component(sublayout, seed) for sublayout in sublayouts]
+        
+        self._merge_components(layout, sublayouts)
+        self._pack_components(layout, sublayouts)
+        if seed is not None:
+            self._anchor_to_seed(layout, seed)
+        # Adjust node positions to ensure they're within bounds
+        self._adjust_node_positions(layout)
+        # Route edges based on new coordinates
+        self._route_edges(layout)
+
+    def _layout_component(self, layout: GraphLayout,
+                          seed: Optional[LayoutSeed] = None) -> GraphLayout:
+        """Layer and order one component and give it natural, unscaled coordinates.
+
+        Coordinates are relative: ``x`` is along the ranks and ``y`` across
+        them, whatever the direction; ``_pack_components`` maps them onto the
+        canvas. Runs in a worker process when ``workers > 1``.
+        """
+        forest = self._layer_and_order(layout, seed)
+        vertical = layout.direction in ["TD", "BT"]
+        if forest is not None:
+            cross = self._tidy_tree_natural(layout, forest, vertical)
+        elif self.coordinates == "brandes_kopf":
+            cross = self._brandes_kopf_natural(layout, vertical)
+        else:
+            widest = max(len(nodes) for nodes in layout.ranks.values())
+            cross = {
+                node_id: (widest - len(nodes)) * self.node_spacing / 2 + i * self.node_spacing
+                for nodes in layout.ranks.values()
+                for i, node_id in enumerate(nodes)
+            }
+        
+        top = min(layout.ranks.keys())
+        for rank, nodes in layout.ranks.items():
+            for i, node_id in enumerate(nodes):
+                node = layout.nodes[node_id]
+                node.x = cross[node_id]
+                node.y = (rank - top) * self.rank_spacing
+                node.order = i
+        return layout
+
+    def _merge_components(self, layout: GraphLayout, sublayouts: List[GraphLayout]) -> None:
+        """Copy laid-out components back into ``layout``, renumbering dummy nodes.
+
+        Components laid out in worker processes number their dummies
+        independently, so every dummy gets a fresh id here. ``order`` is
+        renumbered to match the merged rank lists.
+        """
+        layout.edges = []
+        layout.ranks = defaultdict(list)
+        for sublayout in sublayouts:
+            renamed = {}
+            for node_id, node in sublayout.nodes.items():
+                if node.dummy:
+                    renamed[node_id] = f"dummy_{self.dummy_counter}"
+                    self.dummy_counter += 1
+                    node.id = renamed[node_id]
+                # Workers return copies, so the node objects are replaced too
+                layout.nodes[node.id] = node
             
-            ranks[rank].append(node_id)
+            for edge in sublayout.edges:
+                edge.from_id = renamed.get(edge.from_id, edge.from_id)
+                edge.to_id = renamed.get(edge.to_id, edge.to_id)
+                edge.dummy_nodes = [renamed.get(node_id, node_id) for node_id in edge.dummy_nodes]
+                layout.edges.append(edge)
+            for rank, nodes in sublayout.ranks.items():
+                layout.ranks[rank].extend(renamed.get(node_id, node_id) for node_id in nodes)
+            sublayout.nodes = {node.id: node for node in sublayout.nodes.values()}
+        
+        # Each component numbered its own ranks from 0
+        for nodes in layout.ranks.values():
+            for order, node_id in enumerate(nodes):
+                layout.nodes[node_id].order = order
+
+    def _pack_components(self, layout: GraphLayout, sublayouts: List[GraphLayout]) -> None:
+        """Shelf-pack components with natural coordinates onto the canvas.
+
+        Components are packed across the ranks first, wrapping to a new shelf
+        where that best matches the canvas shape. Each axis is then scaled
+        down if it still does not fit, and the result is centred.
+        """
+        MARGIN = 100
+        vertical = layout.direction in ["TD", "BT"]
+        usable_cross = (self.width if vertical else self.height) - 2 * MARGIN
+        usable_along = (self.height if vertical else self.width) - 2 * MARGIN
+        
+        def extent(node: LayoutNode) -> Tuple[float, float]:
+            """Node size across and along the ranks"""
+            return (node.width, node.height) if vertical else (node.height, node.width)
+        
+        boxes = []
+        for sublayout in sublayouts:
+            nodes = sublayout.nodes.values()
+            boxes.append((
+                min(n.x - extent(n)[0] / 2 for n in nodes),
+                min(n.y - extent(n)[1] / 2 for n in nodes),
+                max(n.x + extent(n)[0] / 2 for n in nodes),
+                max(n.y + extent(n)[1] / 2 for n in nodes),
+            ))
+        sizes = [(right - left, bottom - top) for left, top, right, bottom in boxes]
+        
+        # Try each shelf width at which the row break moves and keep the packing
+        # that needs the least shrinking on its tighter axis
+        gap = self.node_spacing
+        candidates = {max(w for w, _ in sizes)}
+        row = -gap
+        for w, _ in sorted(sizes, key=lambda size: -size[1]):
+            row += w + gap
+            candidates.add(row)
+        
+        def fit(packing) -> float:
+            _, packed_cross, packed_along = packing
+            return min(usable_cross / packed_cross, usable_along / packed_along)
+        
+        corners, packed_cross, packed_along = max(
+            (shelf_pack(sizes, width, gap) for width in sorted(candidates)), key=fit)
+        
+        # Each axis is shrunk only as far as it has to be, like a single layout
+        scale_cross = min(1.0, usable_cross / packed_cross)
+        scale_along = min(1.0, usable_along / packed_along)
+        offset_cross = MARGIN + (usable_cross - packed_cross * scale_cross) / 2
+        offset_along = MARGIN + (usable_along - packed_along * scale_along) / 2
+        for sublayout, box, (corner_cross, corner_along) in zip(sublayouts, boxes, corners):
+            for node in sublayout.nodes.values():
+                cross = offset_cross + (corner_cross + node.x - box[0]) * scale_cross
+                along = offset_along + (corner_along + node.y - box[1]) * scale_along
+                if layout.direction == "TD":
+                    node.x, node.y = cross, along
+                elif layout.direction == "BT":
+                    node.x, node.y = cross, self.height - along
+                elif layout.direction == "LR":
+                    node.x, node.y = along, cross
+                else:  # RL
+                    node.x, node.y = self.width - along, cross
+
+    def _break_cycles(self, layout: GraphLayout) -> None:
+        """Step 0: Reverse a feedback arc set so layering runs on a DAG.
+
+        Reversed edges are flagged and turned back in ``_route_edges``.
+        """
+        reversed_edges = feedback_arc_set(
+            layout.nodes, [(edge.from_id, edge.to_id) for edge in layout.edges])
+        for idx in reversed_edges:
+            edge = layout.edges[idx]
+            edge.from_id, edge.to_id = edge.to_id, edge.from_id
+            edge.reversed = True
+        if reversed_edges:
+            logger.info(f"Reversed {len(reversed_edges)} edges to break cycles")
+
+    def _assign_ranks(self, layout: GraphLayout) -> None:
+        """Step 1: Assign ranks to nodes using longest path layering, refined by ``ranker``"""
+        outgoing = defaultdict(list)
+        indegree = {node_id: 0 for node_id in layout.nodes}
+        for edge in layout.edges:
+            if edge.from_id == edge.to_id:
+                continue
+            outgoing[edge.from_id].append(edge.to_id)
+            indegree[edge.to_id] += 1
+        
+        rank = {node_id: 0 for node_id in layout.nodes}
+        ready = deque(node_id for node_id, count in indegree.items() if count == 0)
+        ranked = set()
+        order = []
+        
+        # Kahn's algorithm: a node is ranked one below its deepest predecessor
+        # once all of them are, so the whole step is O(V + E)
+        while len(ranked) < len(layout.nodes):
+            if not ready:
+                # Only if _break_cycles left a cycle: rank the node with the
+                # fewest unranked predecessors early
+                node_id = min((n for n in layout.nodes if n not in ranked),
+                              key=lambda n: indegree[n])
+                logger.warning(f"Cycle detected, ranking {node_id} before its predecessors")
+                ready.append(node_id)
+            
+            node_id = ready.popleft()
+            ranked.add(node_id)
+            order.append(node_id)
             
-            # Process outgoing edges
-            outgoing = [e for e in layout.edges if e.from_id == node_id]
-            for edge in outgoing:
-                if edge.to_id not in assigned:
-                    assign_rank(edge.to_id, rank + 1)
+            for target in outgoing[node_id]:
+                if target in ranked:
+                    continue  # Edge closing a cycle
+                rank[target] = max(rank[target], rank[node_id] + 1)
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
         
-        # Assign ranks starting from roots
-        for root in roots:
-            assign_rank(root, 0)
+        if self.ranker != "longest_path":
+            # Orient every edge down the ranking; edges closing a cycle within
+            # one rank place no constraint
+            edges = []
+            for edge in layout.edges:
+                if rank[edge.from_id] < rank[edge.to_id]:
+                    edges.append((edge.from_id, edge.to_id))
+                elif rank[edge.to_id] < rank[edge.from_id]:
+                    edges.append((edge.to_id, edge.from_id))
+            if self.ranker == "network_simplex":
+                rank = network_simplex(rank, edges)
+            else:
+                rank = coffman_graham(order, edges, self._max_rank_width(layout),
+                                      self._dummy_width(layout), self._max_ranks(layout))
         
+        # Ranks list nodes in the order they were ranked
+        ranks = defaultdict(list)
+        for node_id in order:
+            layout.nodes[node_id].rank = rank[node_id]
+            ranks[rank[node_id]].append(node_id)
         layout.ranks = ranks
 
+    def _seeded_ranks(self, layout: GraphLayout, seed: LayoutSeed) -> int:
+        """Steps 0-1 from a seed: keep previous ranks, fit new nodes in.
+
+        Returns how far the seeded ranks were shifted up to start at 0.
+        """
+        rank, reversed_edges, top = seeded_ranks(
+            list(layout.nodes), [(edge.from_id, edge.to_id) for edge in layout.edges], seed.ranks)
+        for idx in reversed_edges:
+            edge = layout.edges[idx]
+            edge.from_id, edge.to_id = edge.to_id, edge.from_id
+            edge.reversed = True
+        
+        layout.ranks = defaultdict(list)
+        for node_id, node in layout.nodes.items():
+            node.rank = rank[node_id]
+            layout.ranks[node.rank].append(node_id)
+        return top
+
+    def _seeded_order(self, layout: GraphLayout, seed: LayoutSeed, top: int) -> None:
+        """Step 3 from a seed: keep previous order, slot new members in.
+
+        Nodes (and dummy nodes of known edges) still on their previous rank
+        keep their relative order. Every other member is inserted after the
+        last kept node whose neighbours in the rank above sit at or before its
+        own, by median position, or by the rank below when it has no
+        neighbours above. Transposition then runs from the ranks that gained
+        members or edges only.
+        """
+        above, below = adjacent_neighbours(layout)
+        
+        # Previous order of everything that stayed put
+        kept: Dict[str, int] = {}
+        touched = set()
+        previous_edges = set(seed.chains)
+        merged = layout.merged_edges()
+        for key, edge in zip(edge_keys(merged), merged):
+            chain = seed.chains.get(key, {})
+            for node_id in edge.dummy_nodes:
+                order = chain.get(layout.nodes[node_id].rank + top)
+                if order is not None:
+                    kept[node_id] = order
+            if key not in previous_edges and not edge.dummy_nodes:
+                # A new edge between kept nodes changes the crossings of its two ranks
+                touched.update((layout.nodes[edge.from_id].rank, layout.nodes[edge.to_id].rank))
+        for node_id, node in layout.nodes.items():
+            if not node.dummy and seed.ranks.get(node_id, -1) - top == node.rank:
+                kept[node_id] = seed.orders[node_id]
+        
+        positions: Dict[str, int] = {}
+        for rank in sorted(layout.ranks.keys()):
+            members = layout.ranks[rank]
+            ordered = sorted((n for n in members if n in kept), key=kept.__getitem__)
+            new = [n for n in members if n not in kept]
+            if new:
+                touched.add(rank)
+                ordered = self._insert_by_median(ordered, new, above, below, positions, kept)
+            layout.ranks[rank] = ordered
+            for i, node_id in enumerate(ordered):
+                positions[node_id] = i
+        
+        if touched:
+            self._transpose(layout, sorted(r for r in touched if r in layout.ranks),
+                            above, below, positions)
+
+    def _insert_by_median(self, ordered: List[str], new: List[str],
+                          above: Dict[str, List[str]], below: Dict[str, List[str]],
+                          positions: Dict[str, int], kept: Dict[str, int]) -> List[str]:
+        """Merge ``new`` nodes into ``ordered`` by neighbour medians.
+
+        Ranks above are already placed (``positions``); the rank below still
+        has only its previous order (``kept``).
+        """
+        def median(node_id: str, side: str) -> Optional[float]:
+            if side == 'above':
+                adjacent = sorted(positions[n] for n in above.get(node_id, ()) if n in positions)
+            else:
+                adjacent = sorted(kept[n] for n in below.get(node_id, ()) if n in kept)
+            return self._median(adjacent) if adjacent else None
+        
+        medians = {}  # Of the kept nodes, per side, computed on first use
+        slots = defaultdict(list)  # Insert before ordered[slot]
+        for node_id in new:
+            for side in ('above', 'below'):
+                target = median(node_id, side)
+                if target is None:
+                    continue
+                if side not in medians:
+                    medians[side] = [median(other, side) for other in ordered]
+                slot = 0
+                for i, other_median in enumerate(medians[side]):
+                    if other_median is not None and other_median <= target:
+                        slot = i + 1
+                slots[slot].append((target, node_id))
+                break
+            else:
+                slots[len(ordered)].append((0, node_id))
+        
+        merged = []
+        for i in range(len(ordered) + 1):
+            merged.extend(node_id for _, node_id in sorted(slots.get(i, ())))
+            if i < len(ordered):
+                merged.append(ordered[i])
+        return merged
+
     def _normalize_edges(self, layout: GraphLayout) -> None:
         """Step 2: Add dummy nodes for edges spanning multiple ranks"""
         new_edges = []
@@ -145,23 +672,26 @@ class SugiyamaLayoutGenerator:
                         type="default",
                         rank=rank,
                         dummy=True,
-                        width=10,
-                        height=10
+                        width=DUMMY_SIZE,
+                        height=DUMMY_SIZE
                     )
                     layout.ranks[rank].append(dummy_id)
                     dummy_nodes.append(dummy_id)
                     
-                    # Create edge to dummy node
+                    # Create edge to dummy node; the first segment keeps the label
                     new_edges.append(LayoutEdge(
                         from_id=current_id,
-                        to_id=dummy_id
+                        to_id=dummy_id,
+                        label=edge.label if current_id == edge.from_id else "",
+                        reversed=edge.reversed
                     ))
                     current_id = dummy_id
                 
                 # Connect last dummy to target
                 new_edges.append(LayoutEdge(
                     from_id=current_id,
-                    to_id=edge.to_id
+                    to_id=edge.to_id,
+                    reversed=edge.reversed
                 ))
                 
                 # Store dummy nodes in original edge
@@ -172,64 +702,215 @@ class SugiyamaLayoutGenerator:
         layout.edges = new_edges
 
     def _optimize_crossings(self, layout: GraphLayout) -> None:
-        """Step 3: Minimize edge crossings between adjacent ranks"""
+        """Step 3: Minimize edge crossings between adjacent ranks.
+
+        Runs ``_minimize_crossings`` from the current order and from
+        ``restarts`` shuffles of it, keeping the ordering with fewest crossings.
+        """
+        rank_ids = sorted(layout.ranks.keys())
+        if not rank_ids:
+            return
+        above, below = adjacent_neighbours(layout)
+        
+        ranks = {r: layout.ranks[r] for r in rank_ids}
+        starts = range(self.restarts + 1)
+        # Component layouts may already run in worker processes; those restart in-process
+        if self.restarts and self.workers > 1 and multiprocessing.parent_process() is None:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(self._minimize_crossings, repeat(ranks),
+                                            repeat(above), repeat(below), starts,
+                                            repeat(self.deadline)))
+        else:
+            results = [self._minimize_crossings(ranks, above, below, start, self.deadline)
+                       for start in starts]
+        
+        crossings, start, best_ranks = min(
+            (result[0], start, result[1]) for start, result in enumerate(results)
+            if result is not None)
+        if self.restarts:
+            logger.debug(f"Fewest crossings ({crossings}) from start {start} of {len(results)}")
+        for rank in rank_ids:
+            layout.ranks[rank] = best_ranks[rank]
+
+    def _minimize_crossings(self, ranks: Dict[int, List[str]], above: Dict[str, List[str]],
+                            below: Dict[str, List[str]], start: int,
+                            deadline: Optional[float]) -> Optional[Tuple[int, Dict[int, List[str]]]]:
+        """Weighted-median sweeps with transpositions from the given order (start 0) or a shuffle.
+
+        Returns the fewest crossings found and the ordering that has them, or
+        None if the deadline passed before a shuffled start began.
+        """
         MAX_ITERATIONS = 24
+        PATIENCE = 4  # Sweeps without improvement before giving up
         
-        def count_crossings(rank1: List[str], rank2: List[str]) -> int:
-            """Count number of edge crossings between two ranks"""
-            crossings = 0
-            edges1 = []
-            
-            for idx1, n1 in enumerate(rank1):
-                for e in layout.edges:
-                    if e.from_id == n1 and e.to_id in rank2:
-                        pos2 = rank2.index(e.to_id)
-                        edges1.append((idx1, pos2))
+        if not start:
+            deadline = None
+        elif deadline is not None and time.monotonic() >= deadline:
+            return None
+        # Only the rank lists are needed, so workers get no nodes or edges
+        layout = GraphLayout({}, [], 0, 0)
+        layout.ranks.update((r, list(members)) for r, members in ranks.items())
+        rank_ids = sorted(ranks.keys())
+        if start:
+            rng = random.Random(f"{self.seed}:{start}")
+            for r in rank_ids:
+                rng.shuffle(layout.ranks[r])
+        positions = rank_positions(layout)
+        
+        best_crossings = count_crossings(layout, below, positions)
+        best_ranks = {r: list(layout.ranks[r]) for r in rank_ids}
+        stale = 0
+        
+        for iteration in range(MAX_ITERATIONS):
+            if best_crossings == 0 or (deadline is not None and time.monotonic() >= deadline):
+                break
             
-            for i, (a1, a2) in enumerate(edges1):
-                for b1, b2 in edges1[i+1:]:
-                    if (a1 - b1) * (a2 - b2) < 0:
-                        crossings += 1
+            # Even sweeps order each rank by the one above, odd sweeps by the one below
+            if iteration % 2 == 0:
+                sweep, neighbours = rank_ids[1:], above
+            else:
+                sweep, neighbours = rank_ids[-2::-1], below
+            for rank in sweep:
+                self._order_by_median(layout.ranks[rank], neighbours, positions)
+            self._transpose(layout, rank_ids, above, below, positions, deadline)
             
-            return crossings
+            crossings = count_crossings(layout, below, positions)
+            if crossings < best_crossings:
+                best_crossings = crossings
+                best_ranks = {r: list(layout.ranks[r]) for r in rank_ids}
+                stale = 0
+            else:
+                stale += 1
+                if stale >= PATIENCE:
+                    break
+        
+        return best_crossings, best_ranks
 
-        def optimize_rank_order(rank_idx: int) -> None:
-            """Optimize ordering of nodes in one rank"""
-            if rank_idx not in layout.ranks:
-                return
-                
-            current_rank = layout.ranks[rank_idx]
-            best_order = current_rank.copy()
-            best_crossings = float('inf')
-            
-            # Try different permutations
-            for i in range(len(current_rank)):
-                for j in range(i + 1, len(current_rank)):
-                    current_rank[i], current_rank[j] = current_rank[j], current_rank[i]
-                    
-                    crossings = 0
-                    if rank_idx > 0:
-                        crossings += count_crossings(
-                            layout.ranks[rank_idx - 1], current_rank)
-                    if rank_idx + 1 in layout.ranks:
-                        crossings += count_crossings(
-                            current_rank, layout.ranks[rank_idx + 1])
-                    
-                    if crossings < best_crossings:
-                        best_crossings = crossings
-                        best_order = current_rank.copy()
-                    else:
-                        current_rank[i], current_rank[j] = current_rank[j], current_rank[i]
-            
-            layout.ranks[rank_idx] = best_order
+    @staticmethod
+    def _median(adjacent: List[int]) -> float:
+        """Weighted median of sorted neighbour positions"""
+        mid = len(adjacent) // 2
+        if len(adjacent) % 2 == 1:
+            return adjacent[mid]
+        if len(adjacent) == 2:
+            return (adjacent[0] + adjacent[1]) / 2
+        # Lean toward the side where the neighbours are packed tighter
+        left = adjacent[mid - 1] - adjacent[0]
+        right = adjacent[-1] - adjacent[mid]
+        if left + right == 0:
+            return (adjacent[mid - 1] + adjacent[mid]) / 2
+        return (adjacent[mid - 1] * right + adjacent[mid] * left) / (left + right)
+
+    def _order_by_median(self, rank: List[str], neighbours: Dict[str, List[str]],
+                         positions: Dict[str, int]) -> None:
+        """Reorder ``rank`` in place by the weighted median of neighbour positions.
+
+        Nodes without neighbours on the fixed side keep their slot; ties are
+        broken by barycenter and then by the current order.
+        """
+        keyed = []
+        free_slots = []
+        for i, node_id in enumerate(rank):
+            adjacent = sorted(positions[n] for n in neighbours.get(node_id, ()))
+            if not adjacent:
+                continue
+            free_slots.append(i)
+            barycenter = sum(adjacent) / len(adjacent)
+            keyed.append((self._median(adjacent), barycenter, i, node_id))
         
-        # Iterate multiple times to improve layout
-        for _ in range(MAX_ITERATIONS):
-            for rank_idx in layout.ranks.keys():
-                optimize_rank_order(rank_idx)
+        keyed.sort()
+        for slot, (_, _, _, node_id) in zip(free_slots, keyed):
+            rank[slot] = node_id
+        for i, node_id in enumerate(rank):
+            positions[node_id] = i
+
+    @staticmethod
+    def _pair_crossings(left: List[int], right: List[int]) -> int:
+        """Crossings between two nodes' edges into one neighbouring rank.
+
+        ``left`` and ``right`` are the sorted neighbour positions of the node
+        placed first and second.
+        """
+        if not left or not right:
+            return 0
+        if len(left) == 1:
+            return bisect_left(right, left[0])
+        return sum(bisect_left(right, p) for p in left)
+
+    def _transpose(self, layout: GraphLayout, rank_ids: List[int],
+                   above: Dict[str, List[str]], below: Dict[str, List[str]],
+                   positions: Dict[str, int], deadline: Optional[float] = None) -> None:
+        """Swap adjacent nodes while doing so reduces crossings.
 
-    def _assign_coordinates(self, layout: GraphLayout) -> None:
-        """Step 4: Assign final x,y coordinates based on graph direction"""
+        Makes at most ``MAX_PASSES`` passes over the ranks, fewer if the
+        ``deadline`` passes.
+        """
+        MAX_PASSES = 8
+        
+        pair_crossings = self._pair_crossings
+        # Sorted neighbour positions of every node, patched after each swap
+        ends_above = {}
+        ends_below = {}
+        for rank in layout.ranks.values():
+            for node_id in rank:
+                ends_above[node_id] = sorted(positions[n] for n in above.get(node_id, ()))
+                ends_below[node_id] = sorted(positions[n] for n in below.get(node_id, ()))
+        
+        # A pair's cost only changes when one of its nodes or their neighbours
+        # moved, so later passes revisit just the pairs next to those nodes
+        rank_of = {node_id: r for r, rank in layout.ranks.items() for node_id in rank}
+        dirty = {node_id for r in rank_ids for node_id in layout.ranks[r]}
+        for _ in range(MAX_PASSES):
+            if not dirty or (deadline is not None and time.monotonic() >= deadline):
+                break
+            # Pairs starting just before and at each dirty node
+            pairs = defaultdict(set)
+            for node_id in dirty:
+                i = positions[node_id]
+                pairs[rank_of[node_id]].update((i - 1, i))
+            moved = set()
+            for rank_idx in sorted(pairs):
+                rank = layout.ranks[rank_idx]
+                for i in sorted(pairs[rank_idx]):
+                    if i < 0 or i >= len(rank) - 1:
+                        continue
+                    v, w = rank[i], rank[i + 1]
+                    v_above, w_above = ends_above[v], ends_above[w]
+                    v_below, w_below = ends_below[v], ends_below[w]
+                    kept = pair_crossings(v_above, w_above) + pair_crossings(v_below, w_below)
+                    if kept == 0:
+                        continue
+                    flipped = pair_crossings(w_above, v_above) + pair_crossings(w_below, v_below)
+                    if kept > flipped:
+                        rank[i], rank[i + 1] = w, v
+                        positions[v], positions[w] = i + 1, i
+                        self._swap_ends(ends_below, above, v, w, i)
+                        self._swap_ends(ends_above, below, v, w, i)
+                        moved.update((v, w), above.get(v, ()), above.get(w, ()),
+                                     below.get(v, ()), below.get(w, ()))
+            dirty = moved
+
+    @staticmethod
+    def _swap_ends(ends: Dict[str, List[int]], neighbours: Dict[str, List[str]],
+                   v: str, w: str, i: int) -> None:
+        """After ``v`` at ``i`` and ``w`` at ``i + 1`` swap, patch the sorted
+        positions in ``ends`` of the nodes that list them in ``neighbours``"""
+        for n in {*neighbours.get(v, ()), *neighbours.get(w, ())}:
+            adjacent = ends[n]
+            low = bisect_left(adjacent, i)
+            mid = bisect_left(adjacent, i + 1, low)
+            high = bisect_right(adjacent, i + 1, mid)
+            # Entries at i now point at w and those at i + 1 at v
+            adjacent[low:high] = [i] * (high - mid) + [i + 1] * (mid - low)
+
+    def _assign_coordinates(self, layout: GraphLayout, forest: Optional[Forest] = None,
+                            seed: Optional[LayoutSeed] = None) -> None:
+        """Step 4: Assign final x,y coordinates based on graph direction.
+
+        A ``forest`` from ``_layer_and_order`` is placed as tidy trees
+        regardless of ``coordinates``. With a ``seed`` nodes are pulled toward
+        where the previous frame drew them.
+        """
         max_rank = max(layout.ranks.keys())
         
         # Calculate usable area (with margins)
@@ -237,52 +918,137 @@ class SugiyamaLayoutGenerator:
         usable_width = self.width - (2 * MARGIN)
         usable_height = self.height - (2 * MARGIN)
         
-        # Calculate spacing based on direction
-        if layout.direction in ["TD", "BT"]:  # Top-down or Bottom-up
-            rank_spacing = usable_height / (max_rank + 1)
-            max_nodes_in_rank = max(len(nodes) for nodes in layout.ranks.values())
-            node_spacing = min(self.node_spacing, usable_width / (max_nodes_in_rank + 1))
-            
-            for rank, nodes in layout.ranks.items():
-                # For TD: y increases with rank
-                y = MARGIN + (rank + 1) * rank_spacing if layout.direction == "TD" else \
+        # Ranks run along y for TD/BT and along x for LR/RL; "cross" is the other axis
+        vertical = layout.direction in ["TD", "BT"]
+        rank_spacing = (usable_height if vertical else usable_width) / (max_rank + 1)
+        usable_cross = usable_width if vertical else usable_height
+        
+        if forest is not None:
+            cross = self._fit_cross_positions(
+                layout, self._tidy_tree_natural(layout, forest, vertical), vertical,
+                MARGIN, usable_cross)
+        elif self.coordinates == "brandes_kopf":
+            cross = self._fit_cross_positions(
+                layout, self._brandes_kopf_natural(layout, vertical), vertical,
+                MARGIN, usable_cross)
+        else:
+            cross = self._even_positions(layout, MARGIN, usable_cross)
+        
+        for rank, nodes in layout.ranks.items():
+            # For TD/LR the rank coordinate increases with rank; BT/RL mirror it
+            if vertical:
+                along = MARGIN + (rank + 1) * rank_spacing if layout.direction == "TD" else \
                     self.height - (MARGIN + (rank + 1) * rank_spacing)
-                
-                # Center nodes horizontally
-                total_width = (len(nodes) - 1) * node_spacing
-                start_x = MARGIN + (usable_width - total_width) / 2
-                
-                for i, node_id in enumerate(nodes):
-                    node = layout.nodes[node_id]
-                    node.x = start_x + i * node_spacing
-                    node.y = y
-                    node.order = i
-                    
-        else:  # LR or RL (Left-to-right or Right-to-left)
-            rank_spacing = usable_width / (max_rank + 1)
-            max_nodes_in_rank = max(len(nodes) for nodes in layout.ranks.values())
-            node_spacing = min(self.node_spacing, usable_height / (max_nodes_in_rank + 1))
-            
-            for rank, nodes in layout.ranks.items():
-                # For LR: x increases with rank
-                x = MARGIN + (rank + 1) * rank_spacing if layout.direction == "LR" else \
+            else:
+                along = MARGIN + (rank + 1) * rank_spacing if layout.direction == "LR" else \
                     self.width - (MARGIN + (rank + 1) * rank_spacing)
-                
-                # Center nodes vertically
-                total_height = (len(nodes) - 1) * node_spacing
-                start_y = MARGIN + (usable_height - total_height) / 2
-                
-                for i, node_id in enumerate(nodes):
-                    node = layout.nodes[node_id]
-                    node.x = x
-                    node.y = start_y + i * node_spacing
-                    node.order = i
+            
+            for i, node_id in enumerate(nodes):
+                node = layout.nodes[node_id]
+                node.x, node.y = (cross[node_id], along) if vertical else (along, cross[node_id])
+                node.order = i
         
+        if seed is not None:
+            self._anchor_to_seed(layout, seed)
         # Adjust node positions to ensure they're within bounds
         self._adjust_node_positions(layout)
         # Route edges based on new coordinates
         self._route_edges(layout)
 
+    def _even_positions(self, layout: GraphLayout, margin: float,
+                        usable: float) -> Dict[str, float]:
+        """Cross-axis positions spaced evenly within each rank, each rank centred"""
+        max_nodes_in_rank = max(len(nodes) for nodes in layout.ranks.values())
+        node_spacing = min(self.node_spacing, usable / (max_nodes_in_rank + 1))
+        
+        positions = {}
+        for nodes in layout.ranks.values():
+            total = (len(nodes) - 1) * node_spacing
+            start = margin + (usable - total) / 2
+            for i, node_id in enumerate(nodes):
+                positions[node_id] = start + i * node_spacing
+        return positions
+
+    def _cross_separation(self, layout: GraphLayout, vertical: bool
+                          ) -> Tuple[Dict[str, float], Callable[[str, str], float]]:
+        """Cross-axis node sizes and the minimum centre distance of two neighbours.
+
+        Two default-size nodes sit ``node_spacing`` apart; larger nodes keep
+        the same gap between their boxes and dummy nodes half of it.
+        """
+        size = {
+            node_id: node.width if vertical else node.height
+            for node_id, node in layout.nodes.items()
+        }
+        dummies = {node_id for node_id, node in layout.nodes.items() if node.dummy}
+        node_gap = max(0.0, self.node_spacing - DEFAULT_NODE_SIZE)
+        
+        def separation(a: str, b: str) -> float:
+            gap_a = node_gap / 2 if a in dummies else node_gap
+            gap_b = node_gap / 2 if b in dummies else node_gap
+            return (size[a] + size[b]) / 2 + (gap_a + gap_b) / 2
+        
+        return size, separation
+
+    def _brandes_kopf_natural(self, layout: GraphLayout, vertical: bool) -> Dict[str, float]:
+        """Unscaled cross-axis positions from Brandes-Köpf"""
+        size, separation = self._cross_separation(layout, vertical)
+        dummies = {node_id for node_id, node in layout.nodes.items() if node.dummy}
+        layers = [layout.ranks[rank] for rank in sorted(layout.ranks.keys())]
+        above, below = adjacent_neighbours(layout)
+        # Coffman-Graham wraps a wide rank onto the ones below; bending the long
+        # edges at their end nodes lets the wrapped nodes share columns
+        return brandes_kopf(layers, above, below, dummies, size, separation,
+                            bend_long_edges=self.ranker == "coffman_graham")
+
+    def _tidy_tree_natural(self, layout: GraphLayout, forest: Forest,
+                           vertical: bool) -> Dict[str, float]:
+        """Unscaled cross-axis positions of a forest from Reingold-Tilford"""
+        _, separation = self._cross_separation(layout, vertical)
+        roots, children = forest
+        return tidy_tree(roots, children, separation)
+
+    def _fit_cross_positions(self, layout: GraphLayout, positions: Dict[str, float],
+                             vertical: bool, margin: float, usable: float) -> Dict[str, float]:
+        """Natural cross-axis positions centred on the usable span.
+
+        Layouts wider than the canvas are scaled down to fit.
+        """
+        size = {
+            node_id: node.width if vertical else node.height
+            for node_id, node in layout.nodes.items()
+        }
+        low = min(x - size[node_id] / 2 for node_id, x in positions.items())
+        high = max(x + size[node_id] / 2 for node_id, x in positions.items())
+        extent = high - low
+        if extent <= usable:
+            offset = margin + (usable - extent) / 2 - low
+            return {node_id: x + offset for node_id, x in positions.items()}
+        scale = usable / extent
+        return {node_id: margin + (x - low) * scale for node_id, x in positions.items()}
+
+    def _anchor_to_seed(self, layout: GraphLayout, seed: LayoutSeed) -> None:
+        """Pull nodes across their rank toward where the previous frame drew
+        them; see ``anchored_positions``"""
+        MARGIN = 100
+        
+        vertical = layout.direction in ["TD", "BT"]
+        axis = 0 if vertical else 1
+        previous = {node_id: position[axis] for node_id, position in seed.positions.items()}
+        extent = self.width if vertical else self.height
+        cross = {node_id: node.x if vertical else node.y
+                 for node_id, node in layout.nodes.items()}
+        size = {node_id: node.width if vertical else node.height
+                for node_id, node in layout.nodes.items()}
+        
+        anchored = anchored_positions(layout.ranks.values(), cross, previous, size,
+                                      MARGIN, extent - MARGIN)
+        for node_id, node in layout.nodes.items():
+            if vertical:
+                node.x = anchored[node_id]
+            else:
+                node.y = anchored[node_id]
+
     def _adjust_node_positions(self, layout: GraphLayout) -> None:
         """Adjust node positions to ensure they stay within canvas bounds"""
         MARGIN = 100
@@ -319,8 +1085,13 @@ class SugiyamaLayoutGenerator:
             
             points.append((target.x, target.y))
             edge.points = points
+            
+            # Point edges reversed for layering back the way they were drawn
+            if edge.reversed:
+                edge.from_id, edge.to_id = edge.to_id, edge.from_id
+                edge.points.reverse()
 
-    def save_json(self, layout: GraphLayout, filename: str) -> None:
+    def save_json(self, layout: Union[GraphLayout, CompactLayout], filename: str) -> None:
         """Save layout to JSON file"""
         data = {
             'nodes': {
@@ -0,0 +1,89 @@
+# layout/metrics.py
+
+"""
+Label measurements shared by layout and rendering.
+
+A node's box grows to fit its label. ``TextMetrics`` measures each distinct
+label once with the drawing font and keeps its bounds, so the layout can
+space nodes by the size they are drawn at and the animator draws the same
+boxes without measuring again. ``text_metrics`` hands out one instance per
+font size, which is how the two share their measurements.
+"""
+
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+# Width and height of a node before any label measurement, and the minimum after
+DEFAULT_NODE_SIZE = 80
+# Space between a label and its node's outline
+NODE_PADDING = 20
+
+BBox = Tuple[int, int, int, int]
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int) -> ImageFont.ImageFont:
+    """The label font at ``size``, loaded once per process"""
+    try:
+        return ImageFont.truetype("Arial.ttf", size)
+    except OSError:
+        logger.warning("Arial font not found, using default font")
+        return ImageFont.load_default()
+
+
+class TextMetrics:
+    """LRU cache of label bounds for one font size.
+
+    Pickles as its font size, so generators and animators holding one can be
+    sent to worker processes; the copy measures again on its side.
+    """
+
+    def __init__(self, font_size: int = 20, max_entries: int = 65536):
+        self.font_size = font_size
+        self.max_entries = max_entries
+        self.font = load_font(font_size)
+        self._bounds: 'OrderedDict[str, BBox]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __getstate__(self):
+        return {'font_size': self.font_size, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state) -> None:
+        self.__init__(**state)
+
+    def bbox(self, text: str) -> BBox:
+        """Bounds of ``text`` drawn at the origin, as ``font.getbbox`` returns them"""
+        bounds = self._bounds.get(text)
+        if bounds is not None:
+            self._bounds.move_to_end(text)
+            self.hits += 1
+            return bounds
+
+        self.misses += 1
+        bounds = tuple(self.font.getbbox(text))
+        self._bounds[text] = bounds
+        if len(self._bounds) > self.max_entries:
+            self._bounds.popitem(last=False)
+        return bounds
+
+    def node_size(self, text: str) -> Tuple[int, int]:
+        """Width and height of a node box around ``text``"""
+        left, top, right, bottom = self.bbox(text)
+        return (max(DEFAULT_NODE_SIZE, right - left + 2 * NODE_PADDING),
+                max(DEFAULT_NODE_SIZE, bottom - top + 2 * NODE_PADDING))
+
+
+@lru_cache(maxsize=None)
+def text_metrics(font_size: int = 20) -> TextMetrics:
+    """The shared ``TextMetrics`` for ``font_size``"""
+    return TextMetrics(font_size)
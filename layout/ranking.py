@@ -0,0 +1,333 @@
+# layout/ranking.py
+
+"""
+Network-simplex and width-bounded rank assignment.
+
+``SugiyamaLayoutGenerator._assign_ranks`` always computes longest-path ranks
+first. ``ranker="network_simplex"`` hands them to ``network_simplex`` to be
+tightened; ``ranker="coffman_graham"`` keeps only the order it ranked nodes in
+and lays them out again with ``coffman_graham``.
+
+Longest-path layering puts every source on rank 0, which stretches edges out of
+late-starting branches across many ranks; ``_normalize_edges`` then adds one
+dummy node per spanned rank. ``network_simplex`` takes any feasible ranking and
+moves nodes so the total weighted edge span is minimal (Gansner et al., "A
+Technique for Drawing Directed Graphs", 1993).
+
+The solver keeps a spanning tree of tight edges (span exactly 1) and swaps a
+tree edge with a negative cut value for the non-tree edge of least slack across
+the same cut until no negative cut value is left.
+
+``coffman_graham`` instead bounds how many nodes share a rank. Longest-path
+layering puts all children of a wide fan-out on one rank, which then has to be
+squeezed into the canvas width and sorted as one long list by every crossing
+sweep; capping the rank width spreads them over extra ranks. The edges that
+then span ranks count toward the width too, as the dummy nodes they become.
+"""
+
+from collections import defaultdict
+from heapq import heapify, heappop, heappush
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from layout.components import weakly_connected_components
+
+logger = logging.getLogger(__name__)
+
+
+class _Component:
+    """Network-simplex state for one weakly connected component"""
+
+    def __init__(self, nodes: List[str], edges: List[Tuple[str, str, int]],
+                 ranks: Dict[str, int]):
+        self.nodes = nodes
+        self.edges = edges  # (tail, head, weight); every edge has minimum length 1
+        self.rank = ranks
+        self.incident: Dict[str, List[int]] = defaultdict(list)
+        for idx, (tail, head, _) in enumerate(edges):
+            self.incident[tail].append(idx)
+            self.incident[head].append(idx)
+        # Out-weight minus in-weight; summed over a subtree it gives the cut value
+        self.net: Dict[str, int] = defaultdict(int)
+        for tail, head, weight in edges:
+            self.net[tail] += weight
+            self.net[head] -= weight
+        self.in_tree = [False] * len(edges)
+
+    def slack(self, idx: int) -> int:
+        tail, head, _ = self.edges[idx]
+        return self.rank[head] - self.rank[tail] - 1
+
+    def feasible_tree(self) -> None:
+        """Grow a spanning tree of tight edges, shifting the tree to tighten more"""
+        tree_nodes = {self.nodes[0]}
+        stack = [self.nodes[0]]
+        while True:
+            # Extend the tree along tight edges
+            while stack:
+                node = stack.pop()
+                for idx in self.incident[node]:
+                    tail, head, _ = self.edges[idx]
+                    other = head if tail == node else tail
+                    if other not in tree_nodes and self.slack(idx) == 0:
+                        tree_nodes.add(other)
+                        self.in_tree[idx] = True
+                        stack.append(other)
+            if len(tree_nodes) == len(self.nodes):
+                return
+
+            # Move the whole tree toward the nearest outside node to make one more edge tight
+            best, best_slack = None, None
+            for idx, (tail, head, _) in enumerate(self.edges):
+                if (tail in tree_nodes) != (head in tree_nodes):
+                    slack = self.slack(idx)
+                    if best_slack is None or slack < best_slack:
+                        best, best_slack = idx, slack
+            tail, head, _ = self.edges[best]
+            delta = best_slack if tail in tree_nodes else -best_slack
+            for node in tree_nodes:
+                self.rank[node] += delta
+            stack = list(tree_nodes)
+
+    def _index_tree(self) -> None:
+        """Root the tree and number it in postorder.
+
+        A node ``n`` lies in the subtree of ``x`` exactly when
+        ``low[x] <= lim[n] <= lim[x]``.
+        """
+        self.tree_adj: Dict[str, List[int]] = defaultdict(list)
+        for idx, (tail, head, _) in enumerate(self.edges):
+            if self.in_tree[idx]:
+                self.tree_adj[tail].append(idx)
+                self.tree_adj[head].append(idx)
+
+        root = self.nodes[0]
+        self.parent_edge: Dict[str, Optional[int]] = {root: None}
+        self.low: Dict[str, int] = {}
+        self.lim: Dict[str, int] = {}
+        self.postorder: List[str] = []
+        stack = [(root, iter(self.tree_adj[root]))]
+        while stack:
+            node, children = stack[-1]
+            for idx in children:
+                tail, head, _ = self.edges[idx]
+                child = head if tail == node else tail
+                if child not in self.parent_edge:
+                    self.parent_edge[child] = idx
+                    stack.append((child, iter(self.tree_adj[child])))
+                    break
+            else:
+                stack.pop()
+                self.lim[node] = len(self.postorder)
+                self.low[node] = min(
+                    (self.low[self._child(node, idx)] for idx in self.tree_adj[node]
+                     if idx != self.parent_edge[node]),
+                    default=self.lim[node]
+                )
+                self.postorder.append(node)
+
+    def _child(self, node: str, idx: int) -> str:
+        tail, head, _ = self.edges[idx]
+        return head if tail == node else tail
+
+    def _cut_values(self) -> Dict[int, int]:
+        """Cut value of every tree edge, from subtree sums of ``net``"""
+        subtree_net: Dict[str, int] = {}
+        cut: Dict[int, int] = {}
+        for node in self.postorder:
+            total = self.net[node]
+            for idx in self.tree_adj[node]:
+                if idx != self.parent_edge[node]:
+                    total += subtree_net[self._child(node, idx)]
+            subtree_net[node] = total
+            idx = self.parent_edge[node]
+            if idx is not None:
+                # Positive when the subtree is on the tail side of its parent edge
+                cut[idx] = total if self.edges[idx][0] == node else -total
+        return cut
+
+    def _in_subtree(self, node: str, root: str) -> bool:
+        return self.low[root] <= self.lim[node] <= self.lim[root]
+
+    def _enter_edge(self, leaving: int) -> int:
+        """Non-tree edge of least slack from the head side of ``leaving`` to its tail side"""
+        tail, head, _ = self.edges[leaving]
+        # The endpoint further from the root owns the subtree cut off by the edge
+        subtree = tail if self.parent_edge.get(tail) == leaving else head
+        subtree_is_tail = subtree == tail
+
+        best, best_slack = None, None
+        for idx, (u, v, _) in enumerate(self.edges):
+            if self.in_tree[idx]:
+                continue
+            u_in = self._in_subtree(u, subtree)
+            v_in = self._in_subtree(v, subtree)
+            # The edge must run from the head component into the tail component
+            if u_in != v_in and v_in == subtree_is_tail:
+                slack = self.slack(idx)
+                if best_slack is None or slack < best_slack:
+                    best, best_slack = idx, slack
+        return best
+
+    def _tighten_ranks(self) -> None:
+        """Re-derive ranks from the tree so every tree edge is tight"""
+        for node in reversed(self.postorder):
+            idx = self.parent_edge[node]
+            if idx is None:
+                continue
+            tail, head, _ = self.edges[idx]
+            if head == node:
+                self.rank[node] = self.rank[tail] + 1
+            else:
+                self.rank[node] = self.rank[head] - 1
+
+    def solve(self, max_iterations: int) -> None:
+        self.feasible_tree()
+        self._index_tree()
+        for _ in range(max_iterations):
+            cut = self._cut_values()
+            leaving = next((idx for idx, value in cut.items() if value < 0), None)
+            if leaving is None:
+                return
+            entering = self._enter_edge(leaving)
+            self.in_tree[leaving] = False
+            self.in_tree[entering] = True
+            self._index_tree()
+            self._tighten_ranks()
+        logger.warning(f"Network simplex stopped after {max_iterations} iterations")
+
+
+def network_simplex(ranks: Dict[str, int], edges: List[Tuple[str, str]],
+                    max_iterations: Optional[int] = None) -> Dict[str, int]:
+    """Return ranks minimizing the total span of ``edges``.
+
+    ``ranks`` must be feasible: ``ranks[head] > ranks[tail]`` for every
+    ``(tail, head)`` edge, which any topological layering satisfies. Parallel
+    edges count once per copy. Each weakly connected component is solved on its
+    own and shifted so its top rank is 0.
+    """
+    weights: Dict[Tuple[str, str], int] = defaultdict(int)
+    for tail, head in edges:
+        weights[(tail, head)] += 1
+
+    component_edges: Dict[int, List[Tuple[str, str, int]]] = defaultdict(list)
+    components = weakly_connected_components(ranks, weights)
+    component_of = {node: i for i, nodes in enumerate(components) for node in nodes}
+    for (tail, head), weight in weights.items():
+        component_edges[component_of[tail]].append((tail, head, weight))
+
+    result: Dict[str, int] = {}
+    for i, nodes in enumerate(components):
+        component_ranks = {node: ranks[node] for node in nodes}
+        if len(nodes) > 1:
+            component = _Component(nodes, component_edges[i], component_ranks)
+            component.solve(max_iterations or 10 * len(component.edges) + 100)
+        top = min(component_ranks.values())
+        for node in nodes:
+            result[node] = component_ranks[node] - top
+    return result
+
+
+def coffman_graham(nodes: List[str], edges: List[Tuple[str, str]], width: int,
+                   dummy_width: float = 0.0, max_ranks: Optional[int] = None) -> Dict[str, int]:
+    """Return ranks at most ``width`` wide (Coffman and Graham, 1972).
+
+    ``edges`` must be acyclic. Nodes are first numbered so that a node whose
+    predecessors were numbered earlier comes earlier. Ranks are then filled from
+    the bottom: each takes the highest-numbered nodes whose successors all sit
+    on lower ranks, until it holds ``width`` of them.
+
+    Each edge spanning a rank later puts a dummy node there, counted as
+    ``dummy_width`` of a node. While some rank is wider than ``width`` that
+    way, the real nodes per rank are cut one at a time, keeping the narrowest
+    layering with at most ``max_ranks`` ranks. Edges that must cross a rank
+    (all edges out of a wide fan-out do) can keep it over ``width``.
+    """
+    predecessors: Dict[str, List[str]] = defaultdict(list)
+    successors: Dict[str, List[str]] = defaultdict(list)
+    for tail, head in edges:
+        if tail != head:
+            predecessors[head].append(tail)
+            successors[tail].append(head)
+
+    # Number nodes once all their predecessors are numbered, lexicographically
+    # smallest decreasing list of predecessor numbers first
+    position = {node: i for i, node in enumerate(nodes)}
+    waiting = {node: len(predecessors[node]) for node in nodes}
+    heap = [((), position[node], node) for node in nodes if not waiting[node]]
+    heapify(heap)
+    number: Dict[str, int] = {}
+    while heap:
+        _, _, node = heappop(heap)
+        number[node] = len(number)
+        for head in successors[node]:
+            waiting[head] -= 1
+            if not waiting[head]:
+                key = tuple(sorted((number[tail] for tail in predecessors[head]), reverse=True))
+                heappush(heap, (key, position[head], head))
+
+    rank = _fill_levels(nodes, predecessors, successors, number, width)
+    if not dummy_width:
+        return rank
+
+    best, best_width = rank, _drawn_width(rank, edges, dummy_width)
+    for cap in range(width - 1, 0, -1):
+        if best_width <= width:
+            break
+        rank = _fill_levels(nodes, predecessors, successors, number, cap)
+        if max_ranks is not None and max(rank.values(), default=0) >= max_ranks:
+            break
+        drawn = _drawn_width(rank, edges, dummy_width)
+        if drawn < best_width:
+            best, best_width = rank, drawn
+    return best
+
+
+def _fill_levels(nodes: List[str], predecessors: Dict[str, List[str]],
+                 successors: Dict[str, List[str]], number: Dict[str, int],
+                 width: int) -> Dict[str, int]:
+    """Coffman-Graham ranks holding at most ``width`` real nodes each"""
+    # Fill levels bottom up; a node becomes eligible on the level after its
+    # last successor was placed
+    remaining = {node: len(successors[node]) for node in nodes}
+    ready = [(-number[node], node) for node in nodes if not remaining[node]]
+    heapify(ready)
+    level: Dict[str, int] = {}
+    current = 0
+    while ready:
+        eligible_next = []
+        placed = 0
+        while ready and placed < width:
+            _, node = heappop(ready)
+            level[node] = current
+            placed += 1
+            for tail in predecessors[node]:
+                remaining[tail] -= 1
+                if not remaining[tail]:
+                    eligible_next.append((-number[tail], tail))
+        for item in eligible_next:
+            heappush(ready, item)
+        current += 1
+
+    return {node: current - 1 - level[node] for node in nodes}
+
+
+def _drawn_width(rank: Dict[str, int], edges: List[Tuple[str, str]], dummy_width: float) -> float:
+    """Widest rank counting real nodes as 1 and each spanning edge as ``dummy_width``"""
+    ranks = max(rank.values(), default=0) + 1
+    real = [0] * ranks
+    for r in rank.values():
+        real[r] += 1
+    # Edges entering and leaving the run of ranks they span
+    spanning = [0] * (ranks + 1)
+    for tail, head in edges:
+        if rank[head] - rank[tail] > 1:
+            spanning[rank[tail] + 1] += 1
+            spanning[rank[head]] -= 1
+
+    widest = 0.0
+    crossing = 0
+    for r in range(ranks):
+        crossing += spanning[r]
+        widest = max(widest, real[r] + dummy_width * crossing)
+    return widest
@@ -0,0 +1,181 @@
+# layout/tree.py
+
+"""
+Tidy-tree layout for forests.
+
+Most diagrams are plain trees, where layering, dummy nodes and crossing sweeps
+are wasted work: depth is the rank, child order is the edge order and there
+are no crossings. ``tidy_tree`` positions such a forest with the
+Reingold–Tilford algorithm in the linear-time form of Buchheim, Jünger and
+Leipert (2002): subtrees are placed as close as their contours allow, parents
+are centred over their children and smaller subtrees between two large ones
+are spaced evenly.
+
+Both walks are iterative so deep chains do not hit the recursion limit.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+# Stand-in parent that makes a forest a single tree
+_ROOT = object()
+
+
+class _TreeState:
+    """Per-node bookkeeping of the Buchheim–Walker algorithm"""
+
+    def __init__(self, roots: List[str], children: Dict[str, List[str]],
+                 separation: Callable[[str, str], float]):
+        self.children = {_ROOT: list(roots)}
+        self.children.update(children)
+        self.separation = separation
+        self.parent = {}
+        self.number = {}  # 1-based index among siblings
+        for node, kids in self.children.items():
+            for i, child in enumerate(kids):
+                self.parent[child] = node
+                self.number[child] = i + 1
+        self.prelim: Dict = {}
+        self.mod: Dict = {}
+        self.shift: Dict = {}
+        self.change: Dict = {}
+        self.thread: Dict = {}
+        self.ancestor: Dict = {}
+
+    def kids(self, node) -> List:
+        return self.children.get(node, [])
+
+    def left_sibling(self, node) -> Optional[str]:
+        if node is _ROOT or self.number[node] == 1:
+            return None
+        return self.children[self.parent[node]][self.number[node] - 2]
+
+    def next_left(self, node):
+        kids = self.kids(node)
+        return kids[0] if kids else self.thread.get(node)
+
+    def next_right(self, node):
+        kids = self.kids(node)
+        return kids[-1] if kids else self.thread.get(node)
+
+    def distance(self, left, right) -> float:
+        # The virtual root's children sit side by side like any siblings
+        return self.separation(left, right)
+
+    def first_walk(self) -> None:
+        """Preliminary positions, bottom up (postorder)"""
+        default_ancestor = {}
+        stack = [(_ROOT, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                self.prelim[node] = 0.0
+                self.mod[node] = self.shift[node] = self.change[node] = 0.0
+                self.ancestor[node] = node
+                kids = self.kids(node)
+                if kids:
+                    default_ancestor[node] = kids[0]
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(kids))
+                continue
+
+            kids = self.kids(node)
+            left = self.left_sibling(node)
+            if not kids:
+                if left is not None:
+                    self.prelim[node] = self.prelim[left] + self.distance(left, node)
+            else:
+                self.execute_shifts(node)
+                midpoint = (self.prelim[kids[0]] + self.prelim[kids[-1]]) / 2
+                if left is not None:
+                    self.prelim[node] = self.prelim[left] + self.distance(left, node)
+                    self.mod[node] = self.prelim[node] - midpoint
+                else:
+                    self.prelim[node] = midpoint
+
+            if node is not _ROOT:
+                parent = self.parent[node]
+                default_ancestor[parent] = self.apportion(node, default_ancestor[parent])
+
+    def apportion(self, v, default_ancestor):
+        """Push the subtree of ``v`` clear of its left siblings' subtrees"""
+        w = self.left_sibling(v)
+        if w is None:
+            return default_ancestor
+
+        v_ip = v_op = v
+        v_im = w
+        v_om = self.children[self.parent[v]][0]
+        s_ip = self.mod[v_ip]
+        s_op = self.mod[v_op]
+        s_im = self.mod[v_im]
+        s_om = self.mod[v_om]
+        while self.next_right(v_im) is not None and self.next_left(v_ip) is not None:
+            v_im = self.next_right(v_im)
+            v_ip = self.next_left(v_ip)
+            v_om = self.next_left(v_om)
+            v_op = self.next_right(v_op)
+            self.ancestor[v_op] = v
+            shift = (self.prelim[v_im] + s_im) - (self.prelim[v_ip] + s_ip) + \
+                self.distance(v_im, v_ip)
+            if shift > 0:
+                self.move_subtree(self.find_ancestor(v_im, v, default_ancestor), v, shift)
+                s_ip += shift
+                s_op += shift
+            s_im += self.mod[v_im]
+            s_ip += self.mod[v_ip]
+            s_om += self.mod[v_om]
+            s_op += self.mod[v_op]
+
+        if self.next_right(v_im) is not None and self.next_right(v_op) is None:
+            self.thread[v_op] = self.next_right(v_im)
+            self.mod[v_op] += s_im - s_op
+        if self.next_left(v_ip) is not None and self.next_left(v_om) is None:
+            self.thread[v_om] = self.next_left(v_ip)
+            self.mod[v_om] += s_ip - s_om
+            default_ancestor = v
+        return default_ancestor
+
+    def find_ancestor(self, v_im, v, default_ancestor):
+        ancestor = self.ancestor[v_im]
+        if self.parent.get(ancestor) == self.parent[v]:
+            return ancestor
+        return default_ancestor
+
+    def move_subtree(self, w_m, w_p, shift: float) -> None:
+        subtrees = self.number[w_p] - self.number[w_m]
+        self.change[w_p] -= shift / subtrees
+        self.shift[w_p] += shift
+        self.change[w_m] += shift / subtrees
+        self.prelim[w_p] += shift
+        self.mod[w_p] += shift
+
+    def execute_shifts(self, node) -> None:
+        shift = change = 0.0
+        for child in reversed(self.kids(node)):
+            self.prelim[child] += shift
+            self.mod[child] += shift
+            change += self.change[child]
+            shift += self.shift[child] + change
+
+    def second_walk(self) -> Dict[str, float]:
+        """Final positions, top down, by summing modifiers"""
+        positions = {}
+        stack = [(_ROOT, 0.0)]
+        while stack:
+            node, offset = stack.pop()
+            if node is not _ROOT:
+                positions[node] = self.prelim[node] + offset
+            stack.extend((child, offset + self.mod[node]) for child in self.kids(node))
+        return positions
+
+
+def tidy_tree(roots: List[str], children: Dict[str, List[str]],
+              separation: Callable[[str, str], float]) -> Dict[str, float]:
+    """Cross-axis centre of every node in a forest.
+
+    ``roots`` and each ``children`` list are in drawing order; ``separation``
+    gives the minimum centre distance between two nodes on the same depth.
+    """
+    state = _TreeState(roots, children, separation)
+    state.first_walk()
+    return state.second_walk()
@@ -3,7 +3,10 @@
 from animator.animator import MermaidAnimator, AnimationConfig, Node, Edge
 from examples.examples import MermaidExamples
 from parser.parser import MermaidParser
+from layout.cache import LayoutCache
 from layout.layout import SugiyamaLayoutGenerator
+from layout.metrics import text_metrics
+from typing import Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -11,50 +14,46 @@ logger = logging.getLogger(__name__)
 
 def convert_layout_to_animator(layout) -> tuple[dict[str, Node], list[Edge]]:
     """Convert layout to animator nodes and edges"""
-    # Convert all nodes, including dummy nodes
+    # Convert real nodes; dummy nodes only shape the routed edges
     nodes = {
         node_id: Node(
             id=node_id,
-            label=node.label if not getattr(node, 'dummy', False) else "",
+            label=node.label,
             type=node.type,
             position=(node.x, node.y),
             layer=node.rank  # Use rank as layer
         )
         for node_id, node in layout.nodes.items()
+        if not getattr(node, 'dummy', False)
     }
     
-    # Convert edges with their calculated points
+    # Convert edges, joining dummy chains into one routed polyline
     edges = []
-    for edge in layout.edges:
+    for edge in layout.merged_edges():
         if edge.points and len(edge.points) >= 2:
             edges.append(Edge(
                 start_node=edge.from_id,
                 end_node=edge.to_id,
                 label=edge.label,
                 start_pos=edge.points[0],
-                end_pos=edge.points[-1]
+                end_pos=edge.points[-1],
+                points=list(edge.points)
             ))
     
     return nodes, edges
 
-def create_animated_diagram(mermaid_code: str, output_file: str = "animation.mp4"):
-    """Create an animated diagram from Mermaid code"""
+def create_animated_diagram(mermaid_code: str, output_file: str = "animation.mp4",
+                            layout_cache_dir: Optional[str] = None):
+    """Create an animated diagram from Mermaid code
+
+    Pass ``layout_cache_dir`` to reuse layouts across runs that render the
+    same diagram with different animation settings.
+    """
     logger.info("Step 1: Parsing Mermaid code")
     parser = MermaidParser()
     parsed_graph = parser.parse(mermaid_code)
     parser.save_json("parsed_graph.json")
     
-    logger.info("Step 2: Generating layout")
-    layout_generator = SugiyamaLayoutGenerator(
-        width=1920,
-        height=1080,
-        node_spacing=150,
-        rank_spacing=250
-    )
-    layout = layout_generator.generate_layout(parsed_graph)
-    layout_generator.save_json(layout, "layout.json")
-    
-    logger.info("Step 3: Creating animation")
     config = AnimationConfig(
         width=1920,
         height=1080,
@@ -70,7 +69,20 @@ def create_animated_diagram(mermaid_code: str, output_file: str = "animation.mp4
         edge_color="black",
         text_color="black"
     )
+
+    logger.info("Step 2: Generating layout")
+    layout_generator = SugiyamaLayoutGenerator(
+        width=1920,
+        height=1080,
+        node_spacing=150,
+        rank_spacing=250,
+        cache=LayoutCache(layout_cache_dir) if layout_cache_dir else None,
+        text_metrics=text_metrics(config.font_size)
+    )
+    layout = layout_generator.generate_layout(parsed_graph)
+    layout_generator.save_json(layout, "layout.json")
     
+    logger.info("Step 3: Creating animation")
     animator = MermaidAnimator(config)
     nodes, edges = convert_layout_to_animator(layout)
     animator.nodes = nodes
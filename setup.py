@@ -11,4 +11,7 @@ setup(
         'dataclasses>=0.6',
         'typing-extensions>=4.8.0'
     ],
+    extras_require={
+        'compact': ['numpy>=1.20'],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,41 @@
+# tests/test_crossings.py
+
+"""The accumulator-tree crossing counter against a brute-force count."""
+
+import random
+
+import pytest
+
+from layout.crossings import bilayer_crossings
+
+
+def brute_force_crossings(edges) -> int:
+    """Count crossing edge pairs by checking every pair"""
+    crossings = 0
+    for i, (a_upper, a_lower) in enumerate(edges):
+        for b_upper, b_lower in edges[i + 1:]:
+            if (a_upper - b_upper) * (a_lower - b_lower) < 0:
+                crossings += 1
+    return crossings
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_brute_force_on_random_layers(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        upper_size = rng.randint(1, 40)
+        lower_size = rng.randint(1, 40)
+        edges = [(rng.randrange(upper_size), rng.randrange(lower_size))
+                 for _ in range(rng.randint(0, 120))]
+        assert bilayer_crossings(edges, lower_size) == brute_force_crossings(edges), edges
+
+
+@pytest.mark.parametrize('edges, lower_size, expected', [
+    ([], 1, 0),
+    ([(0, 0), (0, 0)], 1, 0),          # parallel edges
+    ([(0, 0), (0, 1), (1, 0)], 2, 1),  # shared endpoints do not cross
+    ([(0, 1), (1, 0)], 2, 1),
+    ([(0, 2), (1, 1), (2, 0)], 3, 3),
+])
+def test_small_cases(edges, lower_size, expected):
+    assert bilayer_crossings(edges, lower_size) == expected